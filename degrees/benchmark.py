@@ -0,0 +1,62 @@
+"""
+Times degrees.shortest_path with the list based QueueFrontier against DequeFrontier.
+
+Usage: python benchmark.py [directory] [--queries N] [--seed S]
+"""
+
+import argparse
+import random
+import time
+
+from util import QueueFrontier
+
+import degrees
+
+
+def timed(function, *args, **kwargs):
+    """
+    Returns (result, seconds) of one call.
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmark.py")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--queries", type=int, default=5,
+                        help="number of random (source, target) pairs, QueueFrontier is slow on large")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("Loading data...")
+    _, seconds = timed(degrees.load_data, args.directory)
+    print(f"Data loaded in {seconds:.2f}s.")
+
+    random.seed(args.seed)
+    person_ids = list(degrees.people)
+    totals = {"QueueFrontier": 0, "DequeFrontier": 0, "bidirectional": 0}
+    print(f"{'degrees':>8} {'QueueFrontier':>14} {'DequeFrontier':>14} {'bidirectional':>14}")
+    for _ in range(args.queries):
+        source, target = random.sample(person_ids, 2)
+        queue_path, queue_seconds = timed(degrees.shortest_path, source, target, QueueFrontier)
+        deque_path, deque_seconds = timed(degrees.shortest_path, source, target, degrees.DequeFrontier)
+        both_path, both_seconds = timed(degrees.bidirectional_path, source, target)
+        # All three searches are breadth-first, so they have to agree on the separation
+        lengths = {None if path is None else len(path) for path in (queue_path, deque_path, both_path)}
+        assert len(lengths) == 1, f"searches disagree for {source} -> {target}"
+        totals["QueueFrontier"] += queue_seconds
+        totals["DequeFrontier"] += deque_seconds
+        totals["bidirectional"] += both_seconds
+        separation = "-" if deque_path is None else len(deque_path)
+        print(f"{separation:>8} {queue_seconds:>13.3f}s {deque_seconds:>13.3f}s {both_seconds:>13.3f}s")
+
+    print(f"{'total':>8} {totals['QueueFrontier']:>13.3f}s {totals['DequeFrontier']:>13.3f}s "
+          f"{totals['bidirectional']:>13.3f}s")
+    if totals["DequeFrontier"] > 0:
+        print(f"DequeFrontier is {totals['QueueFrontier'] / totals['DequeFrontier']:.1f}x faster than QueueFrontier.")
+
+
+if __name__ == "__main__":
+    main()
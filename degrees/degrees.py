@@ -1,7 +1,23 @@
+import argparse
+import bisect
+import collections
 import csv
+import heapq
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import pickle
+import random
+import struct
 import sys
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
 
-from util import Node, StackFrontier, QueueFrontier
+from util import Node, StackFrontier
 
 
 class Node():
@@ -11,6 +27,498 @@ class Node():
         self.action = action
 
 
+class DequeFrontier():
+    """
+    Breadth-first frontier with the same interface as QueueFrontier,
+    but with O(1) add, remove and contains_state.
+    """
+
+    def __init__(self):
+        self.frontier = collections.deque()
+        # States currently in the frontier, so contains_state does not scan the queue
+        self.states = set()
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states.add(node.state)
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        node = self.frontier.popleft()
+        self.states.discard(node.state)
+        return node
+
+
+class Graph():
+    """
+    Co-star graph with people and movies interned to dense integers.
+
+    Adjacency is stored in compressed sparse row form: the movies of person `i` are
+    person_movies[person_offsets[i]:person_offsets[i + 1]] and the people of movie `m`
+    are movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies, movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        self.movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Scratch space reused by every search so a query does not allocate per person.
+        # A person counts as reached only while its stamp equals the current search's stamp.
+        count = len(person_ids)
+        self.search = 0
+        self.forward_stamp = array("i", bytes(4 * count))
+        self.backward_stamp = array("i", bytes(4 * count))
+        self.forward_person = array("i", bytes(4 * count))
+        self.forward_movie = array("i", bytes(4 * count))
+        self.backward_person = array("i", bytes(4 * count))
+        self.backward_movie = array("i", bytes(4 * count))
+
+    @classmethod
+    def from_edges(cls, person_ids, movie_ids, edge_people, edge_movies):
+        """
+        Builds a graph from parallel arrays of (person index, movie index) edges.
+        """
+        person_offsets, person_movies = compress(len(person_ids), edge_people, edge_movies)
+        movie_offsets, movie_people = compress(len(movie_ids), edge_movies, edge_people)
+        return cls(person_ids, movie_ids, person_offsets, person_movies, movie_offsets, movie_people)
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred with a given person.
+        """
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for k in range(self.person_offsets[person], self.person_offsets[person + 1]):
+            movie = self.person_movies[k]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Yields (movie_id, person_id) pairs for people who starred with a given person.
+        """
+        for movie, person in self.neighbors(self.person_index[person_id]):
+            yield self.movie_ids[movie], self.person_ids[person]
+
+    def shortest_path(self, source, target):
+        """
+        Single-ended breadth-first search over the graph, same result format as shortest_path.
+        """
+        start = self.person_index[source]
+        goal = self.person_index[target]
+        self.search += 1
+        search = self.search
+        stamp = self.forward_stamp
+        parent_person = self.forward_person
+        parent_movie = self.forward_movie
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        stamp[start] = search
+        parent_person[start] = -1
+        queue = [start]
+        for person in queue:
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[j]
+                    if stamp[neighbor] == search:
+                        continue
+                    stamp[neighbor] = search
+                    parent_person[neighbor] = person
+                    parent_movie[neighbor] = movie
+                    if neighbor == goal:
+                        return self.forward_solution(goal)
+                    queue.append(neighbor)
+        return None
+
+    def bidirectional_path(self, source, target):
+        """
+        Bidirectional breadth-first search over the graph, same result format as bidirectional_path.
+        """
+        start = self.person_index[source]
+        goal = self.person_index[target]
+        if start == goal:
+            return []
+        self.search += 1
+        search = self.search
+        self.forward_stamp[start] = search
+        self.forward_person[start] = -1
+        self.backward_stamp[goal] = search
+        self.backward_person[goal] = -1
+
+        forward_frontier = [start]
+        backward_frontier = [goal]
+        while forward_frontier and backward_frontier:
+            # Always expanding the smaller side, same as bidirectional_path
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting = self.expand_layer(
+                    forward_frontier, self.forward_stamp, self.forward_person, self.forward_movie,
+                    self.backward_stamp)
+            else:
+                backward_frontier, meeting = self.expand_layer(
+                    backward_frontier, self.backward_stamp, self.backward_person, self.backward_movie,
+                    self.forward_stamp)
+            if meeting != -1:
+                solution = self.forward_solution(meeting)
+                person = meeting
+                while self.backward_person[person] != -1:
+                    following = self.backward_person[person]
+                    solution.append((self.movie_ids[self.backward_movie[person]], self.person_ids[following]))
+                    person = following
+                return solution
+        return None
+
+    def expand_layer(self, frontier, stamp, parent_person, parent_movie, other):
+        """
+        Expands one breadth-first layer, returns the next layer and the meeting person (or -1).
+        """
+        search = self.search
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        layer = []
+        for person in frontier:
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[j]
+                    if stamp[neighbor] == search:
+                        continue
+                    stamp[neighbor] = search
+                    parent_person[neighbor] = person
+                    parent_movie[neighbor] = movie
+                    if other[neighbor] == search:
+                        return layer, neighbor
+                    layer.append(neighbor)
+        return layer, -1
+
+    def forward_solution(self, person):
+        """
+        Walks the forward parents back from `person` into a list of (movie_id, person_id) pairs.
+        """
+        solution = []
+        while self.forward_person[person] != -1:
+            solution.append((self.movie_ids[self.forward_movie[person]], self.person_ids[person]))
+            person = self.forward_person[person]
+        solution.reverse()
+        return solution
+
+    def distances(self, source):
+        """
+        Breadth-first search from the person index `source` over the whole graph.
+        Returns a bytearray of separations, UNREACHABLE for people in other components.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        distance = bytearray([UNREACHABLE]) * len(self.person_ids)
+        distance[source] = 0
+        frontier = [source]
+        depth = 0
+        while frontier:
+            # Separations are kept in one byte each, deeper people are clamped just below UNREACHABLE
+            depth = min(depth + 1, UNREACHABLE - 1)
+            layer = []
+            for person in frontier:
+                for k in range(person_offsets[person], person_offsets[person + 1]):
+                    movie = person_movies[k]
+                    for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                        neighbor = movie_people[j]
+                        if distance[neighbor] == UNREACHABLE:
+                            distance[neighbor] = depth
+                            layer.append(neighbor)
+            frontier = layer
+        return distance
+
+
+# Separation stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class Landmarks():
+    """
+    Distance oracle over a Graph built from full breadth-first searches out of a few landmark people.
+
+    For any landmark l, |d(l, s) - d(l, t)| <= d(s, t) <= d(l, s) + d(l, t),
+    which gives instant lower and upper bounds on the separation of s and t.
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        # Person indices of the landmarks and one bytearray (or mapped bytes) of separations per landmark
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count=16):
+        """
+        Picks `count` well connected landmarks and runs a breadth-first search from each.
+        Candidates are taken by number of movies, skipping people next to an existing landmark
+        so the landmarks spread over the graph instead of bunching up in one cast.
+        """
+        candidates = sorted(range(len(graph.person_ids)),
+                            key=lambda person: graph.person_offsets[person] - graph.person_offsets[person + 1])
+        landmarks = []
+        distances = []
+        for person in candidates:
+            if len(landmarks) == count:
+                break
+            if any(distance[person] <= 1 for distance in distances):
+                continue
+            landmarks.append(person)
+            distances.append(graph.distances(person))
+        return cls(graph, landmarks, distances)
+
+    def save(self, path):
+        """
+        Writes the landmarks to `path`: a header, the landmark indices as int32
+        and one byte per person per landmark.
+        """
+        with open(path, "wb") as f:
+            f.write(LANDMARKS_HEADER.pack(LANDMARKS_MAGIC, LANDMARKS_VERSION,
+                                          len(self.graph.person_ids), len(self.landmarks)))
+            f.write(array("i", self.landmarks))
+            for distance in self.distances:
+                f.write(distance)
+
+    @classmethod
+    def load(cls, path, graph):
+        """
+        Memory-maps landmarks written by save. Returns None if the file is missing,
+        from another version or was built for a different graph.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, people_count, count = LANDMARKS_HEADER.unpack_from(data)
+        except (OSError, ValueError, struct.error):
+            return None
+        size = len(graph.person_ids)
+        if magic != LANDMARKS_MAGIC or version != LANDMARKS_VERSION or people_count != size or \
+                len(data) != LANDMARKS_HEADER.size + 4 * count + count * size:
+            return None
+        view = memoryview(data)
+        position = LANDMARKS_HEADER.size
+        landmarks = list(view[position:position + 4 * count].cast("i"))
+        position += 4 * count
+        distances = [view[position + i * size:position + (i + 1) * size] for i in range(count)]
+        return cls(graph, landmarks, distances)
+
+    def person_bounds(self, person, goal):
+        """
+        Returns (lower, upper) bounds on the separation of two person indices.
+        lower is None if a landmark proves they are not connected, upper is None if no landmark reaches both.
+        """
+        lower = 0
+        upper = None
+        for distance in self.distances:
+            a = distance[person]
+            b = distance[goal]
+            if a == UNREACHABLE and b == UNREACHABLE:
+                continue
+            # A landmark reaching only one of them means they are in different components
+            if a == UNREACHABLE or b == UNREACHABLE:
+                return None, None
+            lower = max(lower, abs(a - b))
+            if upper is None or a + b < upper:
+                upper = a + b
+        return lower, upper
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the separation of two person_ids, see person_bounds.
+        """
+        index = self.graph.person_index
+        return self.person_bounds(index[source], index[target])
+
+    def distance(self, source, target):
+        """
+        Returns the exact separation of two person_ids, or None if they are not connected.
+        Answers straight from the bounds when they meet, otherwise runs a bidirectional search
+        that stops at the upper bound and only expands people which could still lead to a shorter path.
+        """
+        graph = self.graph
+        start = graph.person_index[source]
+        goal = graph.person_index[target]
+        if start == goal:
+            return 0
+        lower, upper = self.person_bounds(start, goal)
+        if lower is None:
+            return None
+        if lower == upper:
+            return upper
+
+        graph.search += 1
+        graph.forward_stamp[start] = graph.search
+        graph.backward_stamp[goal] = graph.search
+        forward_frontier = [start]
+        backward_frontier = [goal]
+        forward_depth = 0
+        backward_depth = 0
+        while forward_frontier and backward_frontier:
+            # A meeting in the next layer would be this long, which can no longer beat the upper bound
+            if upper is not None and forward_depth + backward_depth + 1 >= upper:
+                return upper
+            # After the last layer that can still beat the upper bound nothing gets expanded again
+            final = upper is not None and forward_depth + backward_depth + 2 >= upper
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_depth += 1
+                forward_frontier, met = self.expand_layer(
+                    forward_frontier, forward_depth, goal, upper, final, graph.forward_stamp, graph.backward_stamp)
+            else:
+                backward_depth += 1
+                backward_frontier, met = self.expand_layer(
+                    backward_frontier, backward_depth, start, upper, final, graph.backward_stamp, graph.forward_stamp)
+            if met:
+                return forward_depth + backward_depth
+        return upper
+
+    def expand_layer(self, frontier, depth, end, upper, final, stamp, other):
+        """
+        Expands one layer of the bounded search in distance. People whose landmark lower bound
+        to the `end` of the other side rules out beating `upper` are marked but not expanded,
+        and on the `final` layer nobody is kept for expanding at all.
+        Returns the next layer and whether both sides met.
+        """
+        graph = self.graph
+        search = graph.search
+        person_offsets = graph.person_offsets
+        person_movies = graph.person_movies
+        movie_offsets = graph.movie_offsets
+        movie_people = graph.movie_people
+        # Looking the end up once per layer, only the neighbor side changes in the bound below
+        ends = [(distance, distance[end]) for distance in self.distances]
+        limit = None if upper is None else upper - depth
+        layer = []
+        for person in frontier:
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[j]
+                    if stamp[neighbor] == search:
+                        continue
+                    stamp[neighbor] = search
+                    if other[neighbor] == search:
+                        return layer, True
+                    if final:
+                        continue
+                    if limit is not None:
+                        for distance, end_distance in ends:
+                            neighbor_distance = distance[neighbor]
+                            # Same as person_bounds: one side unreachable or the lower bound reaching the limit
+                            if (neighbor_distance == UNREACHABLE) != (end_distance == UNREACHABLE) or \
+                                    abs(neighbor_distance - end_distance) >= limit:
+                                break
+                        else:
+                            layer.append(neighbor)
+                        continue
+                    layer.append(neighbor)
+        return layer, False
+
+
+class NameIndex():
+    """
+    Prefix and trigram index over the lowercased names in the names dict, for match_names.
+    """
+
+    def __init__(self):
+        # Sorted names for prefix lookups with bisect
+        self.keys = sorted(names)
+        # Maps each trigram to an array of positions in self.keys of the names containing it
+        postings = {}
+        for position, key in enumerate(self.keys):
+            for trigram in trigrams(key):
+                postings.setdefault(trigram, []).append(position)
+        self.postings = {trigram: array("i", positions) for trigram, positions in postings.items()}
+
+    def prefixed(self, prefix, budget):
+        """
+        Returns the names starting with `prefix`, at most `budget` of them in alphabetical order.
+        """
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + "\uffff", start, min(start + budget, len(self.keys)))
+        return self.keys[start:end]
+
+    def similar(self, query, limit, budget):
+        """
+        Returns up to `limit` (similarity, name) pairs sharing trigrams with `query`, best first.
+
+        Candidates come from the rarest trigrams of the query first and stop being collected
+        once `budget` postings were read, which keeps common trigrams like "an " from
+        turning every lookup into a scan. Similarity is the Dice coefficient of the trigram sets.
+        """
+        grams = trigrams(query)
+        shared = collections.Counter()
+        read = 0
+        for trigram in sorted(grams, key=lambda trigram: len(self.postings.get(trigram, ()))):
+            positions = self.postings.get(trigram)
+            if positions is None:
+                continue
+            if read and read + len(positions) > budget:
+                break
+            shared.update(positions)
+            read += len(positions)
+
+        scored = []
+        for position, _ in shared.most_common(limit * 4):
+            key = self.keys[position]
+            key_grams = trigrams(key)
+            scored.append((2 * len(grams & key_grams) / (len(grams) + len(key_grams)), key))
+        scored.sort(reverse=True)
+        return scored[:limit]
+
+
+def trigrams(text):
+    """
+    Returns the set of three character substrings of `text`, padded so starts and ends count too.
+    """
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# Landmark distances file written next to the CSV files
+LANDMARKS = "landmarks.bin"
+LANDMARKS_VERSION = 1
+LANDMARKS_MAGIC = b"LANDMARK"
+# Magic, version, people count, landmark count
+LANDMARKS_HEADER = struct.Struct("<8sIII")
+
+
+def compress(count, keys, values):
+    """
+    Groups parallel (key, value) arrays by key into CSR offsets and targets arrays.
+    """
+    offsets = array("i", bytes(4 * (count + 1)))
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    targets = array("i", bytes(4 * len(keys)))
+    position = offsets[:-1]
+    for key, value in zip(keys, values):
+        targets[position[key]] = value
+        position[key] += 1
+    return offsets, targets
+
+
 # Maps names to a set of corresponding person_ids
 names = {}
 
@@ -20,10 +528,51 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact co-star graph, only set when data is loaded with the "csr" backend.
+# In that case people and movies keep just their names, births, titles and years.
+graph = None
+
+# Landmark distance oracle, only set when batch queries are answered with --landmarks
+landmarks = None
+
+# Trigram and prefix index over names, only set when data is loaded with index=True
+name_index = None
+
+# Compact graph the analytics workers run on, built from the dicts for the dict backend
+analytics_graph = None
 
-def load_data(directory):
+# Binary snapshot written next to the CSV files, bump the version whenever its layout changes
+SNAPSHOT = "degrees.snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b"DEGREES" + (b"<" if sys.byteorder == "little" else b">")
+# Magic, version, people count, movie count, edge count, metadata size in bytes
+SNAPSHOT_HEADER = struct.Struct("<8sIIIIQ")
+
+
+def load_data(directory, backend="dict", snapshot=True, index=False):
     """
     Load data from CSV files into memory.
+
+    With `snapshot`, the parsed data is also written to a binary snapshot next to
+    the CSV files, and later runs memory-map that snapshot instead of parsing
+    the CSV files as long as it is newer than all of them.
+    With `index`, the fuzzy name index used by match_names is built as well.
+    """
+    global name_index
+    if not (snapshot and read_snapshot(directory, backend)):
+        if backend == "csr":
+            load_graph(directory)
+        else:
+            load_dicts(directory)
+        if snapshot:
+            write_snapshot(directory)
+    if index:
+        name_index = NameIndex()
+
+
+def load_dicts(directory):
+    """
+    Load data from CSV files into the people, movies and names dicts.
     """
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
@@ -53,22 +602,235 @@ def load_data(directory):
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            try:
+            # Rows naming an unknown person or movie are dropped, like load_graph does
+            if row["person_id"] in people and row["movie_id"] in movies:
                 people[row["person_id"]]["movies"].add(row["movie_id"])
                 movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+
+
+def load_graph(directory):
+    """
+    Load data from CSV files into the compact integer-indexed graph.
+    """
+    global graph
+    person_ids = []
+    movie_ids = []
+
+    # Load people
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            person_ids.append(row["id"])
+            people[row["id"]] = {
+                "name": row["name"],
+                "birth": row["birth"]
+            }
+            names.setdefault(row["name"].lower(), set()).add(row["id"])
+
+    # Load movies
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            movie_ids.append(row["id"])
+            movies[row["id"]] = {
+                "title": row["title"],
+                "year": row["year"]
+            }
+
+    # Load stars as (person index, movie index) edges, dropping unknown ids and repeated rows
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    seen = set()
+    edge_people = array("i")
+    edge_movies = array("i")
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            person = person_index.get(row["person_id"])
+            movie = movie_index.get(row["movie_id"])
+            if person is None or movie is None:
+                continue
+            edge = person * len(movie_ids) + movie
+            if edge in seen:
+                continue
+            seen.add(edge)
+            edge_people.append(person)
+            edge_movies.append(movie)
+
+    graph = Graph.from_edges(person_ids, movie_ids, edge_people, edge_movies)
+
+
+def build_graph():
+    """
+    Returns a compact graph of the data loaded into the people and movies dicts.
+    """
+    if graph is not None:
+        return graph
+    person_ids = list(people)
+    movie_ids = list(movies)
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    edge_people = array("i")
+    edge_movies = array("i")
+    for person, person_id in enumerate(person_ids):
+        for movie_id in people[person_id]["movies"]:
+            edge_people.append(person)
+            edge_movies.append(movie_index[movie_id])
+    return Graph.from_edges(person_ids, movie_ids, edge_people, edge_movies)
+
+
+def write_snapshot(directory):
+    """
+    Writes the loaded data to the binary snapshot in `directory`.
+    The snapshot is a header, the four CSR arrays as native int32 and the pickled names, births, titles and years.
+    """
+    snapshot = build_graph()
+    metadata = pickle.dumps((
+        snapshot.person_ids,
+        [people[person_id]["name"] for person_id in snapshot.person_ids],
+        [people[person_id]["birth"] for person_id in snapshot.person_ids],
+        snapshot.movie_ids,
+        [movies[movie_id]["title"] for movie_id in snapshot.movie_ids],
+        [movies[movie_id]["year"] for movie_id in snapshot.movie_ids],
+    ), protocol=pickle.HIGHEST_PROTOCOL)
+    path = os.path.join(directory, SNAPSHOT)
+    # Writing to a temporary file first so a reader never maps a half written snapshot
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(snapshot.person_ids),
+                                         len(snapshot.movie_ids), len(snapshot.person_movies), len(metadata)))
+            for values in (snapshot.person_offsets, snapshot.person_movies,
+                           snapshot.movie_offsets, snapshot.movie_people):
+                f.write(values)
+            f.write(metadata)
+        os.replace(temporary, path)
+    except OSError:
+        # The snapshot is only a cache, a read-only data directory just means parsing again next time
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def read_snapshot(directory, backend):
+    """
+    Loads the data from the binary snapshot in `directory` if it is present, current
+    and newer than the CSV files. Returns True if the data was loaded.
+    """
+    global graph
+    path = os.path.join(directory, SNAPSHOT)
+    try:
+        modified = os.path.getmtime(path)
+        for filename in ("people.csv", "movies.csv", "stars.csv"):
+            if os.path.getmtime(os.path.join(directory, filename)) > modified:
+                return False
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, people_count, movie_count, edge_count, metadata_size = SNAPSHOT_HEADER.unpack_from(data)
+    except (OSError, ValueError, struct.error):
+        return False
+    sizes = (people_count + 1, edge_count, movie_count + 1, edge_count)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or \
+            len(data) != SNAPSHOT_HEADER.size + 4 * sum(sizes) + metadata_size:
+        return False
+
+    # The CSR arrays stay in the mapped pages, so processes loading the same snapshot share them
+    view = memoryview(data)
+    position = SNAPSHOT_HEADER.size
+    arrays = []
+    for size in sizes:
+        arrays.append(view[position:position + 4 * size].cast("i"))
+        position += 4 * size
+    person_offsets, person_movies, movie_offsets, movie_people = arrays
+    try:
+        person_ids, person_names, births, movie_ids, titles, years = pickle.loads(view[position:])
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, KeyError,
+            TypeError, ValueError):
+        # Metadata corrupted in place, the size checks above can not see that
+        return False
+
+    for person_id, name, birth in zip(person_ids, person_names, births):
+        people[person_id] = {"name": name, "birth": birth}
+        names.setdefault(name.lower(), set()).add(person_id)
+    for movie_id, title, year in zip(movie_ids, titles, years):
+        movies[movie_id] = {"title": title, "year": year}
+
+    if backend == "csr":
+        graph = Graph(person_ids, movie_ids, person_offsets, person_movies, movie_offsets, movie_people)
+        return True
+
+    # The dict backend gets its sets rebuilt from the arrays, which still skips parsing the CSV files
+    for person, person_id in enumerate(person_ids):
+        people[person_id]["movies"] = {
+            movie_ids[movie] for movie in person_movies[person_offsets[person]:person_offsets[person + 1]]
+        }
+    for movie, movie_id in enumerate(movie_ids):
+        movies[movie_id]["stars"] = {
+            person_ids[person] for person in movie_people[movie_offsets[movie]:movie_offsets[movie + 1]]
+        }
+    return True
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(prog="degrees.py")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--single", action="store_true",
+                        help="use the single-ended breadth-first search instead of the bidirectional one")
+    parser.add_argument("--all", action="store_true",
+                        help="print every shortest connection instead of only the first one found")
+    parser.add_argument("--backend", choices=["dict", "csr"], default="dict",
+                        help="keep the data as dicts of sets or as a compact integer-indexed graph")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="always parse the CSV files and do not write the binary snapshot")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="answer tab separated 'source<TAB>target' lines from FILE (or stdin) as JSON lines")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="number of worker processes answering batch queries")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="keep the data loaded and answer GET /path?source=...&target=... on localhost")
+    parser.add_argument("--build-landmarks", type=int, metavar="COUNT",
+                        help=f"run breadth-first searches from COUNT landmark people and save them to {LANDMARKS}")
+    parser.add_argument("--analytics", action="store_true",
+                        help="report components, degree histograms and sampled separation of the co-star graph")
+    parser.add_argument("--samples", type=int, default=1000,
+                        help="number of breadth-first search sources sampled by --analytics")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for the --analytics samples")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="build the name index so batch and server queries accept misspelled and partial names")
+    parser.add_argument("--landmarks", action="store_true",
+                        help=f"answer batch and server queries with separation counts from {LANDMARKS}, without paths")
+    args = parser.parse_args()
+
+    global landmarks
+
+    # Batch and server output goes to stdout, so progress messages go to stderr there
+    log = sys.stderr if args.batch is not None or args.serve is not None else sys.stdout
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    print("Loading data...", file=log)
+    load_data(args.directory, args.backend, snapshot=not args.no_snapshot, index=args.fuzzy)
+    print("Data loaded.", file=log)
+
+    if args.build_landmarks is not None:
+        print(f"Building {args.build_landmarks} landmarks...")
+        Landmarks.build(build_graph(), args.build_landmarks).save(os.path.join(args.directory, LANDMARKS))
+        print("Landmarks saved.")
+        return
+    if args.landmarks:
+        landmarks = Landmarks.load(os.path.join(args.directory, LANDMARKS), build_graph())
+        if landmarks is None:
+            sys.exit(f"No usable {LANDMARKS}, build it with --build-landmarks COUNT.")
+
+    if args.analytics:
+        run_analytics(args.samples, args.seed, args.processes, args.directory, args.backend)
+        return
+    if args.batch is not None:
+        run_batch(args.batch, args.single, args.processes, args.directory, args.backend)
+        return
+    if args.serve is not None:
+        serve(args.serve, args.single)
+        return
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -77,12 +839,21 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
-
-    if path is None:
-        print("Not connected.")
+    if args.all:
+        paths = all_shortest_paths(source, target)
+    elif args.single:
+        paths = [shortest_path(source, target)]
     else:
+        paths = [bidirectional_path(source, target)]
+
+    found = False
+    for number, path in enumerate(paths, 1):
+        if path is None:
+            break
+        found = True
         degrees = len(path)
+        if args.all:
+            print(f"Connection {number}:")
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
@@ -90,18 +861,24 @@ def main():
             person2 = people[path[i + 1][1]]["name"]
             movie = movies[path[i + 1][0]]["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+    if not found:
+        print("Not connected.")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, frontier_class=DequeFrontier):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+    `frontier_class` only matters for the dict backend (the benchmark passes QueueFrontier).
     """
+    if graph is not None:
+        return graph.shortest_path(source, target)
+
     start = Node(state=source, parent=None, action=None)
     # Creating frontier
-    frontier = QueueFrontier()
+    frontier = frontier_class()
     frontier.add(start)
     # Creating explored set
     explored = set()
@@ -133,6 +910,131 @@ def shortest_path(source, target):
                 frontier.add(nodecandidate)
 
 
+def bidirectional_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both ends at once.
+
+    If no possible path, returns None.
+    """
+    if graph is not None:
+        return graph.bidirectional_path(source, target)
+    if source == target:
+        return []
+
+    # Maps every reached person to the (movie_id, person_id) step that reached them,
+    # one map for the search from the source and one for the search from the target
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        # Always expanding the smaller side, that is what keeps both searches small
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(forward_frontier, forward, backward)
+        else:
+            backward_frontier, meeting = expand_layer(backward_frontier, backward, forward)
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+    # One of the searches ran out of people, so there is no connection
+    return None
+
+
+def expand_layer(frontier, reached, other):
+    """
+    Expands one whole breadth-first layer of a bidirectional search.
+    Returns the next layer and the person where both searches met (or None).
+    """
+    layer = []
+    for person in frontier:
+        for movie_id, person_id in neighbors_for_person(person):
+            if person_id in reached:
+                continue
+            reached[person_id] = (movie_id, person)
+            # Whole layers are expanded at a time, so the first meeting is on a shortest path
+            if person_id in other:
+                return layer, person_id
+            layer.append(person_id)
+    return layer, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins the two halves of a bidirectional search at the meeting person
+    into a list of (movie_id, person_id) pairs from the source to the target.
+    """
+    # Walking back from the meeting person to the source
+    solution = []
+    person = meeting
+    while forward[person] is not None:
+        movie_id, previous = forward[person]
+        solution.append((movie_id, person))
+        person = previous
+    solution.reverse()
+    # Walking forward from the meeting person to the target
+    person = meeting
+    while backward[person] is not None:
+        movie_id, following = backward[person]
+        solution.append((movie_id, following))
+        person = following
+    return solution
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, one at a time.
+
+    One breadth-first pass records, for each person up to the target's layer, every
+    (movie_id, person_id) step from the previous layer. Paths are then walked lazily
+    from the target back through those steps, so memory is bounded by the layers and
+    not by the number of paths, which can be exponential.
+    """
+    if source == target:
+        yield []
+        return
+
+    depth = {source: 0}
+    # Maps people to all (movie_id, person_id) steps reaching them from the previous layer
+    predecessors = {}
+    frontier = [source]
+    level = 0
+    while frontier and target not in predecessors:
+        level += 1
+        layer = []
+        for person in frontier:
+            for movie_id, neighbor in neighbors_for_person(person):
+                if neighbor not in depth:
+                    depth[neighbor] = level
+                    predecessors[neighbor] = [(movie_id, person)]
+                    layer.append(neighbor)
+                elif depth[neighbor] == level:
+                    predecessors[neighbor].append((movie_id, person))
+        frontier = layer
+    if target not in predecessors:
+        return
+
+    # Depth-first walk from the target, the stack only ever holds the path being built
+    stack = [(target, iter(predecessors[target]))]
+    steps = []
+    while stack:
+        person, options = stack[-1]
+        step = next(options, None)
+        if step is None:
+            stack.pop()
+            if steps:
+                steps.pop()
+            continue
+        movie_id, previous = step
+        steps.append((movie_id, person))
+        if previous == source:
+            yield steps[::-1]
+            steps.pop()
+        else:
+            stack.append((previous, iter(predecessors[previous])))
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -164,6 +1066,9 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    # The compact graph yields the pairs straight from its arrays instead of building a set
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -172,5 +1077,350 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def film_count(person_id):
+    """
+    Returns the number of movies a person starred in, for either backend.
+    """
+    if graph is not None:
+        person = graph.person_index[person_id]
+        return graph.person_offsets[person + 1] - graph.person_offsets[person]
+    return len(people[person_id]["movies"])
+
+
+def match_names(name, limit=10, budget=5000):
+    """
+    Returns up to `limit` person_ids whose names best match a possibly misspelled or partial `name`.
+
+    Exact matches rank first, then names starting with `name`, then names by trigram similarity.
+    People sharing a name, all names starting with `name` (up to `budget` of them) and names that
+    are equally similar are ranked by how many films they starred in.
+    Needs the index built by load_data(..., index=True).
+    """
+    if name_index is None:
+        raise RuntimeError("match_names needs the name index, load the data with index=True")
+    query = " ".join(name.lower().split())
+    if not query:
+        return []
+    # Ranked by (kind of match, similarity, film count), kinds being 2 exact, 1 prefix and 0 similar
+    ranked = {}
+    for kind, similarity, key in itertools.chain(
+            [(2, 1.0, query)] if query in names else [],
+            ((1, 1.0, key) for key in name_index.prefixed(query, budget)),
+            ((0, similarity, key) for similarity, key in name_index.similar(query, limit, budget))):
+        for person_id in names[key]:
+            rank = (kind, similarity, film_count(person_id))
+            if ranked.get(person_id, rank) <= rank:
+                ranked[person_id] = rank
+    return heapq.nlargest(limit, ranked, key=lambda person_id: (ranked[person_id], person_id))
+
+
+def resolve_person(name):
+    """
+    Non-interactive version of person_id_for_name for batch queries.
+    Accepts a name or a person_id and returns (person_id, error).
+    With the name index loaded, unknown names resolve to their best match_names candidate.
+    """
+    if name in people:
+        return name, None
+    person_ids = names.get(name.lower(), set())
+    if len(person_ids) == 0 and name_index is not None:
+        candidates = match_names(name, limit=1)
+        if candidates:
+            return candidates[0], None
+    if len(person_ids) == 0:
+        return None, {"error": "not found", "name": name}
+    elif len(person_ids) > 1:
+        return None, {"error": "ambiguous", "name": name, "candidates": sorted(person_ids)}
+    return next(iter(person_ids)), None
+
+
+def answer_query(query):
+    """
+    Answers one (source name, target name, single) query as a JSON-ready dictionary.
+    """
+    source_name, target_name, single = query
+    answer = {"source": source_name, "target": target_name}
+    source, error = resolve_person(source_name)
+    if error is None:
+        target, error = resolve_person(target_name)
+    if error is not None:
+        answer.update(error)
+        return answer
+    # Telling clients who their (possibly misspelled) names were resolved to
+    answer["source_id"] = source
+    answer["target_id"] = target
+
+    if landmarks is not None:
+        answer["lower"], answer["upper"] = landmarks.bounds(source, target)
+        answer["degrees"] = landmarks.distance(source, target)
+        return answer
+
+    path = shortest_path(source, target) if single else bidirectional_path(source, target)
+    if path is None:
+        answer["degrees"] = None
+        answer["path"] = None
+        return answer
+    answer["degrees"] = len(path)
+    answer["path"] = [
+        {"movie_id": movie_id, "title": movies[movie_id]["title"],
+         "person_id": person_id, "name": people[person_id]["name"]}
+        for movie_id, person_id in path
+    ]
+    return answer
+
+
+def read_queries(lines, single):
+    """
+    Yields (source name, target name, single) queries from tab separated lines, skipping blank ones.
+    """
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        source_name, _, target_name = line.partition("\t")
+        yield source_name.strip(), target_name.strip(), single
+
+
+def init_worker(directory, backend, index, use_landmarks):
+    """
+    Makes sure a batch worker has the data loaded.
+    Forked workers inherit the parent's data (and mapped snapshot pages), so they skip this.
+    """
+    global landmarks
+    if not people:
+        load_data(directory, backend, index=index)
+        if use_landmarks:
+            landmarks = Landmarks.load(os.path.join(directory, LANDMARKS), build_graph())
+
+
+def pool_context():
+    """
+    Returns the multiprocessing context for worker pools.
+    Preferring fork so the workers share the already loaded graph instead of loading it again.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def run_batch(filename, single, processes, directory, backend):
+    """
+    Answers every query line of `filename` ("-" for stdin) and streams the answers as JSON lines,
+    in the same order as the queries.
+    """
+    lines = sys.stdin if filename == "-" else open(filename, encoding="utf-8")
+    try:
+        queries = read_queries(lines, single)
+        if processes <= 1:
+            for answer in map(answer_query, queries):
+                print(json.dumps(answer), flush=True)
+            return
+        with pool_context().Pool(processes, initializer=init_worker,
+                          initargs=(directory, backend, name_index is not None, landmarks is not None)) as pool:
+            for answer in pool.imap(answer_query, queries, chunksize=16):
+                print(json.dumps(answer), flush=True)
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET /path?source=...&target=... with the JSON answer of answer_query.
+    """
+    single = False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parameters = parse_qs(url.query)
+        if url.path != "/path" or "source" not in parameters or "target" not in parameters:
+            self.respond(400, {"error": "usage: /path?source=NAME&target=NAME"})
+            return
+        query = (parameters["source"][0], parameters["target"][0], self.single)
+        self.respond(200, answer_query(query))
+
+    def respond(self, status, answer):
+        body = json.dumps(answer).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"{self.address_string()} {format % args}\n")
+
+
+def serve(port, single):
+    """
+    Keeps the loaded data resident and answers queries over HTTP on localhost until interrupted.
+    Requests are answered one at a time, the compact graph reuses its search arrays between queries.
+    """
+    QueryHandler.single = single
+    server = HTTPServer(("127.0.0.1", port), QueryHandler)
+    print(f"Serving on http://127.0.0.1:{port}/path?source=...&target=...", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def init_analytics_worker(directory, backend):
+    """
+    Makes sure an analytics worker has the compact graph, forked workers inherit it.
+    """
+    global analytics_graph
+    if analytics_graph is None:
+        load_data(directory, backend)
+        analytics_graph = build_graph()
+
+
+def costar_histogram(chunk):
+    """
+    Returns a Counter of co-star counts (distinct people sharing a movie) for person indices in range(*chunk).
+    """
+    graph = analytics_graph
+    histogram = collections.Counter()
+    for person in range(*chunk):
+        # Counting each co-star once with the graph's stamps instead of building a set per person
+        graph.search += 1
+        graph.forward_stamp[person] = graph.search
+        costars = 0
+        for _, neighbor in graph.neighbors(person):
+            if graph.forward_stamp[neighbor] != graph.search:
+                graph.forward_stamp[neighbor] = graph.search
+                costars += 1
+        histogram[costars] += 1
+    return histogram
+
+
+def separation_profile(person):
+    """
+    Runs a full breadth-first search from one person index.
+    Returns (eccentricity, Counter of separations to everyone reachable).
+    """
+    separations = collections.Counter(analytics_graph.distances(person))
+    del separations[0]
+    separations.pop(UNREACHABLE, None)
+    return max(separations, default=0), separations
+
+
+def components(graph):
+    """
+    Returns the sizes of the connected components of the graph, largest first.
+    Union-find over people, every movie joins its whole cast.
+    """
+    parent = array("i", range(len(graph.person_ids)))
+
+    def find(person):
+        while parent[person] != person:
+            # Path halving keeps the trees flat without recursion
+            parent[person] = parent[parent[person]]
+            person = parent[person]
+        return person
+
+    for movie in range(len(graph.movie_ids)):
+        cast = graph.movie_people[graph.movie_offsets[movie]:graph.movie_offsets[movie + 1]]
+        if len(cast) < 2:
+            continue
+        root = find(cast[0])
+        for person in cast[1:]:
+            other = find(person)
+            if other != root:
+                parent[other] = root
+    sizes = collections.Counter(find(person) for person in range(len(parent)))
+    return sorted(sizes.values(), reverse=True)
+
+
+def report_progress(label, done, total, started):
+    """
+    Rewrites one progress line on stderr, about a hundred times per phase.
+    """
+    if done != total and done % max(1, total // 100) != 0:
+        return
+    elapsed = time.perf_counter() - started
+    end = "\n" if done == total else ""
+    print(f"\r{label}: {done}/{total} ({elapsed:.1f}s)", end=end, file=sys.stderr, flush=True)
+
+
+def print_histogram(title, histogram):
+    """
+    Prints a histogram bucketed by powers of two, heavy tails stay readable that way.
+    """
+    buckets = collections.Counter()
+    for value, count in histogram.items():
+        buckets[0 if value == 0 else 1 << (value.bit_length() - 1)] += count
+    print(title)
+    for bucket in sorted(buckets):
+        label = str(bucket) if bucket <= 1 else f"{bucket}-{2 * bucket - 1}"
+        print(f"  {label:>15}: {buckets[bucket]}")
+
+
+def run_analytics(samples, seed, processes, directory, backend):
+    """
+    Reports corpus-wide statistics of the co-star graph: film and co-star count histograms,
+    connected components, and eccentricity and average separation from `samples` random sources.
+    Breadth-first searches and co-star counts are spread over `processes` workers.
+    """
+    global analytics_graph
+    started = time.perf_counter()
+    analytics_graph = build_graph()
+    graph = analytics_graph
+    count = len(graph.person_ids)
+    print(f"Graph: {count} people, {len(graph.movie_ids)} movies, {len(graph.person_movies)} roles "
+          f"({time.perf_counter() - started:.2f}s)")
+
+    pool = None
+    if processes > 1:
+        pool = pool_context().Pool(processes, initializer=init_analytics_worker, initargs=(directory, backend))
+    mapper = map if pool is None else pool.imap_unordered
+    try:
+        films = collections.Counter(
+            graph.person_offsets[person + 1] - graph.person_offsets[person] for person in range(count)
+        )
+        print_histogram("Films per person:", films)
+
+        started = time.perf_counter()
+        chunk = max(1, count // (max(processes, 1) * 16))
+        chunks = [(start, min(start + chunk, count)) for start in range(0, count, chunk)]
+        costars = collections.Counter()
+        for done, histogram in enumerate(mapper(costar_histogram, chunks), 1):
+            costars.update(histogram)
+            report_progress("Co-star counts", done, len(chunks), started)
+        print_histogram(f"Co-stars per person ({time.perf_counter() - started:.2f}s):", costars)
+
+        started = time.perf_counter()
+        sizes = components(graph)
+        print(f"Components ({time.perf_counter() - started:.2f}s): {len(sizes)} total, "
+              f"largest {sizes[0] if sizes else 0} people, {sizes.count(1)} isolated people")
+
+        started = time.perf_counter()
+        sources = random.Random(seed).sample(range(count), min(samples, count))
+        eccentricities = collections.Counter()
+        separations = collections.Counter()
+        for done, (eccentricity, profile) in enumerate(mapper(separation_profile, sources), 1):
+            eccentricities[eccentricity] += 1
+            separations.update(profile)
+            report_progress("Separation samples", done, len(sources), started)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    pairs = sum(separations.values())
+    print(f"Separation from {len(sources)} sampled people ({time.perf_counter() - started:.2f}s):")
+    if pairs:
+        average = sum(separation * number for separation, number in separations.items()) / pairs
+        print(f"  average separation over {pairs} connected pairs: {average:.3f}")
+        print(f"  largest sampled eccentricity (diameter lower bound): {max(eccentricities)}")
+    for separation in sorted(separations):
+        print(f"  {separation:>3} degrees: {separations[separation]} pairs")
+    print("Sampled eccentricities:")
+    for eccentricity in sorted(eccentricities):
+        print(f"  {eccentricity:>3}: {eccentricities[eccentricity]} people")
+
+
 if __name__ == "__main__":
     main()
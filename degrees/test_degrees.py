@@ -0,0 +1,123 @@
+import random
+from array import array
+
+import pytest
+
+# degrees.py imports util.py from the CS50 distribution code, which is not part of this repository
+pytest.importorskip("util")
+
+import degrees  # noqa: E402
+from degrees import UNREACHABLE, Graph, Landmarks  # noqa: E402
+
+
+def random_graph(people, movies, seed):
+    """
+    Returns a Graph of `people` people and `movies` movies with two to four people each,
+    where the last tenth of the people only star with each other.
+    """
+    rng = random.Random(seed)
+    split = people - people // 10
+    edge_people = array("i")
+    edge_movies = array("i")
+    for movie in range(movies):
+        pool = range(split) if movie % 10 else range(split, people)
+        for person in rng.sample(pool, rng.randint(2, 4)):
+            edge_people.append(person)
+            edge_movies.append(movie)
+    person_ids = [str(person) for person in range(people)]
+    movie_ids = [str(movie) for movie in range(movies)]
+    return Graph.from_edges(person_ids, movie_ids, edge_people, edge_movies)
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("count", [1, 4])
+def test_landmark_distance_matches_breadth_first_search(seed, count):
+    graph = random_graph(300, 200, seed)
+    landmarks = Landmarks.build(graph, count)
+    rng = random.Random(seed)
+    for source in rng.sample(range(len(graph.person_ids)), 20):
+        separations = graph.distances(source)
+        for target in range(len(graph.person_ids)):
+            expected = None if separations[target] == UNREACHABLE else separations[target]
+            assert landmarks.distance(graph.person_ids[source], graph.person_ids[target]) == expected
+
+
+def test_saved_landmarks_give_the_same_distances(tmp_path):
+    graph = random_graph(100, 80, 0)
+    landmarks = Landmarks.build(graph, 4)
+    path = str(tmp_path / "landmarks.bin")
+    landmarks.save(path)
+    loaded = Landmarks.load(path, graph)
+    assert loaded.landmarks == landmarks.landmarks
+    for target in graph.person_ids:
+        assert loaded.distance("0", target) == landmarks.distance("0", target)
+
+
+def write_csv(directory, filename, header, rows):
+    with open(directory / filename, "w", encoding="utf-8") as f:
+        f.write(",".join(header) + "\n")
+        f.writelines(",".join(row) + "\n" for row in rows)
+
+
+def reset():
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.names.clear()
+    degrees.graph = None
+
+
+@pytest.mark.parametrize("backend", ["dict", "csr"])
+def test_stars_of_unknown_movies_are_dropped(tmp_path, backend):
+    write_csv(tmp_path, "people.csv", ["id", "name", "birth"], [["1", "Ann", "1950"], ["2", "Bob", "1960"]])
+    write_csv(tmp_path, "movies.csv", ["id", "title", "year"], [["10", "Film", "1990"]])
+    write_csv(tmp_path, "stars.csv", ["person_id", "movie_id"],
+              [["1", "10"], ["2", "10"], ["1", "99"], ["3", "10"]])
+    reset()
+    try:
+        degrees.load_data(str(tmp_path), backend)
+        assert degrees.shortest_path("1", "2") == [("10", "2")]
+        # The second load comes from the snapshot the first one wrote
+        reset()
+        degrees.load_data(str(tmp_path), backend)
+        assert (tmp_path / degrees.SNAPSHOT).exists()
+        assert degrees.shortest_path("1", "2") == [("10", "2")]
+    finally:
+        reset()
+
+
+def test_corrupt_snapshot_falls_back_to_csv(tmp_path):
+    write_csv(tmp_path, "people.csv", ["id", "name", "birth"], [["1", "Ann", "1950"], ["2", "Bob", "1960"]])
+    write_csv(tmp_path, "movies.csv", ["id", "title", "year"], [["10", "Film", "1990"]])
+    write_csv(tmp_path, "stars.csv", ["person_id", "movie_id"], [["1", "10"], ["2", "10"]])
+    reset()
+    try:
+        degrees.load_data(str(tmp_path))
+        path = tmp_path / degrees.SNAPSHOT
+        data = bytearray(path.read_bytes())
+        # Overwriting the start of the pickled metadata, which ends the file, keeps the size right
+        metadata_size = degrees.SNAPSHOT_HEADER.unpack_from(data)[-1]
+        data[-metadata_size:-metadata_size + 8] = b"\xff" * 8
+        path.write_bytes(bytes(data))
+        reset()
+        assert not degrees.read_snapshot(str(tmp_path), "dict")
+        reset()
+        degrees.load_data(str(tmp_path))
+        assert degrees.shortest_path("1", "2") == [("10", "2")]
+    finally:
+        reset()
+
+
+def test_prefix_matches_are_ranked_by_film_count(tmp_path):
+    people = [[f"p{i}", f"Tom A{i:02}", ""] for i in range(30)] + [["hanks", "Tom Hanks", "1956"]]
+    movies = [[f"m{i}", f"Film {i}", "2000"] for i in range(80)]
+    stars = [["hanks", f"m{i}"] for i in range(80)] + [[f"p{i}", f"m{i}"] for i in range(30)]
+    write_csv(tmp_path, "people.csv", ["id", "name", "birth"], people)
+    write_csv(tmp_path, "movies.csv", ["id", "title", "year"], movies)
+    write_csv(tmp_path, "stars.csv", ["person_id", "movie_id"], stars)
+    reset()
+    try:
+        degrees.load_data(str(tmp_path), snapshot=False, index=True)
+        assert degrees.match_names("tom", limit=5)[0] == "hanks"
+        assert set(degrees.match_names("tom a0", limit=5)) <= {f"p{i}" for i in range(10)}
+    finally:
+        reset()
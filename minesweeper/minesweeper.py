@@ -1,5 +1,6 @@
 import itertools
 import random
+from collections import deque
 
 
 class Minesweeper():
@@ -136,18 +137,317 @@ class Sentence():
         if cell in self.cells:
             self.cells.remove(cell)
 
+    def key(self):
+        """
+        Returns a hashable value equal for equal sentences.
+        """
+        return (frozenset(self.cells), self.count)
+
+    def issubset(self, other):
+        """
+        Returns True if every cell of this sentence is also in `other`.
+        """
+        return self.cells.issubset(other.cells)
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of this sentence that are not in `other`,
+        a subset of it: their mines are the ones `other` does not account for.
+        """
+        return Sentence(self.cells - other.cells, self.count - other.count)
+
+
+class BitSentence():
+    """
+    Sentence with its cells stored as one integer, bit i * width + j set for cell (i, j).
+    Interchangeable with Sentence, but subset checks and differences are single integer
+    operations, and it is hashable. Like Sentence it changes when cells are marked, so it
+    should not be marked while it is in a set or a dict key.
+    """
+
+    __slots__ = ("mask", "count", "width")
+
+    def __init__(self, cells, count, width):
+        self.mask = 0
+        for (i, j) in cells:
+            self.mask |= 1 << (i * width + j)
+        self.count = count
+        self.width = width
+
+    @classmethod
+    def from_mask(cls, mask, count, width):
+        # Skipping __init__, the mask needs no building from cells
+        sentence = cls.__new__(cls)
+        sentence.mask = mask
+        sentence.count = count
+        sentence.width = width
+        return sentence
+
+    @property
+    def cells(self):
+        """
+        The set of board cells of the sentence, decoded from the mask.
+        """
+        cells = set()
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            cells.add(divmod(low.bit_length() - 1, self.width))
+            mask ^= low
+        return cells
+
+    def __eq__(self, other):
+        if isinstance(other, BitSentence):
+            return self.mask == other.mask and self.count == other.count
+        return self.cells == other.cells and self.count == other.count
+
+    def __hash__(self):
+        return hash((self.mask, self.count))
+
+    def __str__(self):
+        return f"{self.cells} = {self.count}"
+
+    def bit(self, cell):
+        return 1 << (cell[0] * self.width + cell[1])
+
+    def known_mines(self):
+        """
+        Returns the set of all cells in self.cells known to be mines.
+        """
+        if bin(self.mask).count("1") == self.count:
+            return self.cells
+
+    def known_safes(self):
+        """
+        Returns the set of all cells in self.cells known to be safe.
+        """
+        if self.count == 0:
+            return self.cells
+
+    def mark_mine(self, cell):
+        """
+        Updates internal knowledge representation given the fact that
+        a cell is known to be a mine.
+        """
+        if self.mask & self.bit(cell):
+            self.mask ^= self.bit(cell)
+            self.count -= 1
+
+    def mark_safe(self, cell):
+        """
+        Updates internal knowledge representation given the fact that
+        a cell is known to be safe.
+        """
+        self.mask &= ~self.bit(cell)
+
+    def key(self):
+        """
+        Returns a hashable value equal for equal sentences.
+        """
+        return (self.mask, self.count)
+
+    def issubset(self, other):
+        """
+        Returns True if every cell of this sentence is also in `other`.
+        """
+        return self.mask & ~other.mask == 0
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of this sentence that are not in `other`,
+        a subset of it: their mines are the ones `other` does not account for.
+        """
+        return BitSentence.from_mask(self.mask & ~other.mask, self.count - other.count, self.width)
+
+
+class KnowledgeBase():
+    """
+    Sentences known to be true, indexed by the cells they mention.
+
+    Every sentence is stored once. Sentences that are new or changed since they were last
+    looked at wait in a worklist, so inference only revisits what changed and only compares
+    a sentence with the sentences that share a cell with it.
+    """
+
+    def __init__(self):
+        # Sentences by id, and the id of every sentence by its (cells, count)
+        self.sentences = {}
+        self.keys = {}
+        # Ids of the sentences mentioning each cell
+        self.index = {}
+        # Ids of new or changed sentences, each at most once
+        self.worklist = deque()
+        self.pending = set()
+        self.next_id = 0
+
+    def __iter__(self):
+        return iter(list(self.sentences.values()))
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def __contains__(self, sentence):
+        return sentence.key() in self.keys
+
+    def add(self, sentence):
+        """
+        Stores a sentence (a Sentence or a BitSentence) unless it is empty or already known.
+        Returns True if it was stored.
+        """
+        key = sentence.key()
+        if not key[0] or key in self.keys:
+            return False
+        ident = self.next_id
+        self.next_id += 1
+        self.sentences[ident] = sentence
+        self.keys[key] = ident
+        for cell in sentence.cells:
+            self.index.setdefault(cell, set()).add(ident)
+        self.changed(ident)
+        return True
+
+    def remove(self, ident):
+        """
+        Forgets a stored sentence.
+        """
+        sentence = self.sentences.pop(ident)
+        del self.keys[sentence.key()]
+        for cell in sentence.cells:
+            self.index[cell].discard(ident)
+        self.pending.discard(ident)
+
+    def mark(self, cell, mine):
+        """
+        Removes a cell known to be a mine (or safe) from every sentence mentioning it.
+        """
+        for ident in self.index.pop(cell, ()):
+            sentence = self.sentences[ident]
+            del self.keys[sentence.key()]
+            if mine:
+                sentence.mark_mine(cell)
+            else:
+                sentence.mark_safe(cell)
+            key = sentence.key()
+            if not key[0] or key in self.keys:
+                # Nothing left to say, or the same as another sentence now
+                del self.sentences[ident]
+                for other in sentence.cells:
+                    self.index[other].discard(ident)
+                self.pending.discard(ident)
+            else:
+                self.keys[key] = ident
+                self.changed(ident)
+
+    def changed(self, ident):
+        if ident not in self.pending:
+            self.pending.add(ident)
+            self.worklist.append(ident)
+
+    def pop(self):
+        """
+        Returns (id, sentence) of the next new or changed sentence, or None if there is none.
+        """
+        while self.worklist:
+            ident = self.worklist.popleft()
+            if ident in self.pending:
+                self.pending.remove(ident)
+                return ident, self.sentences[ident]
+        return None
+
+    def overlapping(self, ident):
+        """
+        Returns the other sentences sharing at least one cell with sentence `ident`.
+        """
+        found = set()
+        for cell in self.sentences[ident].cells:
+            found |= self.index[cell]
+        found.discard(ident)
+        return [self.sentences[other] for other in found]
+
+
+class BitKnowledgeBase(KnowledgeBase):
+    """
+    KnowledgeBase of BitSentences. Instead of a cell index, the sentences mentioning a cell
+    or sharing a cell with another sentence are found by ANDing masks, and `covered`, the
+    union of the masks of the stored sentences, skips marking cells no sentence mentions.
+    No mask is ever decoded into cells while sentences are stored, marked or compared.
+    """
+
+    def __init__(self, width):
+        super().__init__()
+        self.width = width
+        # Every cell of a stored sentence has its bit set, removed sentences may leave bits behind
+        self.covered = 0
+
+    def add(self, sentence):
+        key = sentence.key()
+        if not key[0] or key in self.keys:
+            return False
+        ident = self.next_id
+        self.next_id += 1
+        self.sentences[ident] = sentence
+        self.keys[key] = ident
+        self.covered |= sentence.mask
+        self.changed(ident)
+        return True
+
+    def remove(self, ident):
+        sentence = self.sentences.pop(ident)
+        del self.keys[sentence.key()]
+        self.pending.discard(ident)
+
+    def mark(self, cell, mine):
+        self.mark_mask(1 << (cell[0] * self.width + cell[1]), mine)
+
+    def mark_mask(self, mask, mine):
+        """
+        Removes every cell of `mask`, all known to be mines (or safe), from the sentences
+        mentioning them, looking at every sentence once.
+        """
+        mask &= self.covered
+        if not mask:
+            return
+        self.covered &= ~mask
+        for ident in [ident for ident, sentence in self.sentences.items() if sentence.mask & mask]:
+            sentence = self.sentences[ident]
+            del self.keys[sentence.key()]
+            if mine:
+                sentence.count -= bin(sentence.mask & mask).count("1")
+            sentence.mask &= ~mask
+            key = sentence.key()
+            if not key[0] or key in self.keys:
+                # Nothing left to say, or the same as another sentence now
+                del self.sentences[ident]
+                self.pending.discard(ident)
+            else:
+                self.keys[key] = ident
+                self.changed(ident)
+
+    def overlapping(self, ident):
+        """
+        Returns the other sentences sharing at least one cell with sentence `ident`.
+        """
+        mask = self.sentences[ident].mask
+        return [sentence for other, sentence in self.sentences.items() if other != ident and sentence.mask & mask]
+
 
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, bitmask=False):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Storing sentences as BitSentence instead of Sentence
+        self.bitmask = bitmask
+        # With bitmask, the cells known to be mines and the cells known either way as masks too
+        self.mine_mask = 0
+        self.known_mask = 0
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -155,8 +455,8 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Sentences about the game known to be true
+        self.knowledge = BitKnowledgeBase(width) if bitmask else KnowledgeBase()
 
     def mark_mine(self, cell):
         """
@@ -164,8 +464,11 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        if self.bitmask:
+            bit = 1 << (cell[0] * self.width + cell[1])
+            self.mine_mask |= bit
+            self.known_mask |= bit
+        self.knowledge.mark(cell, mine=True)
 
     def mark_safe(self, cell):
         """
@@ -173,8 +476,22 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        if self.bitmask:
+            self.known_mask |= 1 << (cell[0] * self.width + cell[1])
+        self.knowledge.mark(cell, mine=False)
+
+    def mark_mask(self, mask, mine):
+        """
+        With bitmask, marks every cell of `mask` as a mine (or safe) at once.
+        """
+        cells = BitSentence.from_mask(mask, 0, self.width).cells
+        if mine:
+            self.mines |= cells
+            self.mine_mask |= mask
+        else:
+            self.safes |= cells
+        self.known_mask |= mask
+        self.knowledge.mark_mask(mask, mine)
 
     def neighborsofcell(self, cell):
         # Returns all neighbors of that cell
@@ -205,56 +522,69 @@ class MinesweeperAI():
                 concluded_count -= 1
         return (unknown_neighbors, concluded_count)
 
-    def updateknowledge(self):
-        '''
-        Iterating over sentences in the knowledge base checking if there is new detected mines or safes in that perticular sentence
-        If we detected mines or safes in that particular sentence, we are updating all sentences
-        (We are using Sentence class's mark_mine or mark_safe functions on all sentences (in knowledge base) for updating the sentences contents)
-        '''
-        for sentence in self.knowledge.copy():
-            if sentence.known_mines() != None:
-                # If we are there that means we produceded empty sentence we have to delete it for faster program otherwise it will iterate over empty sentence in inferance function for nothing
-                # We have to check if it's in knowledge becouse maybe sentence is not in knowledge. Becouse other if statement can delete it also
-                if sentence in self.knowledge:
-                    # It won't effect that loop becouse we copied the self.knowledge in the begenning
-                    self.knowledge.remove(sentence)
-                    # Copied becouse self.mark_safe(safe) is changing the sentence.known_safes() doing iteration:
-                for mine in sentence.known_mines().copy():
-                    self.mark_mine(mine)
-
-            # Same as above if statement except this is for safes
-            if sentence.known_safes() != None:
-                if sentence in self.knowledge:
-                    self.knowledge.remove(sentence)
-                for safe in sentence.known_safes().copy():
-                    self.mark_safe(safe)
+    def unknown_mask(self, cell, count):
+        # Same as unknwnneighbors with masks: (mask of the unknown neighbors, count of mines among them)
+        i, j = cell
+        # Columns j - 1 to j + 1 inside the board, repeated for the rows i - 1 to i + 1 inside it
+        low, high = max(j - 1, 0), min(j + 1, self.width - 1)
+        columns = ((1 << (high - low + 1)) - 1) << low
+        neighbors = 0
+        for row in range(max(i - 1, 0), min(i + 1, self.height - 1) + 1):
+            neighbors |= columns << (row * self.width)
+        neighbors &= ~(1 << (i * self.width + j))
+        return neighbors & ~self.known_mask, count - bin(neighbors & self.mine_mask).count("1")
+
+    def new_sentence(self, cells, count):
+        # Returns a sentence of the kind this AI stores
+        if self.bitmask:
+            return BitSentence(cells, count, self.width)
+        return Sentence(cells, count)
 
     def inferance(self):
         '''
-        Checking if we can make new sentences from previous ones (inferanceing)
-        Adding new sentences to the knowledge base
-        How we checking if we infer new sentences ?
-            Taking 2 sentences and checking if one of them is subseting other
+        Making inferances from the sentences in the knowledge worklist until nothing new follows.
+            If a sentence tells its cells are all mines or all safes, marking them (which changes the sentences mentioning them)
+            Otherwise checking if it is subseting one of the sentences sharing a cell with it, or the other way around
             If there is a subset, substracting subset from set. Also we substracting the count value of subset from our set's count value
             The concleded set and concluded count value becomes our new sentence.
-
         '''
-        for sentence1 in self.knowledge.copy():
-            for sentence2 in self.knowledge.copy():
-                if sentence1.cells.issubset(sentence2.cells):
-                    subcells = sentence2.cells - sentence1.cells
-                    subcount = sentence2.count - sentence1.count
-                    new_sentence = Sentence(subcells, subcount)
-                    if new_sentence not in self.knowledge:
-                        self.knowledge.append(new_sentence)
-                elif sentence2.cells.issubset(sentence1.cells):
-                    subcells = sentence1.cells - sentence2.cells
-                    subcount = sentence1.count - sentence2.count
-                    new_sentence = Sentence(subcells, subcount)
-                    if new_sentence not in self.knowledge:
-                        self.knowledge.append(new_sentence)
-        # We have to update knowledge becouse we added new sentences and maybe those sentences contains new mines and safes(It updates all sentences in the knowledge base)
-        self.updateknowledge()
+        while True:
+            item = self.knowledge.pop()
+            if item is None:
+                return
+            ident, sentence = item
+            if self.bitmask:
+                self.infer_masks(ident, sentence)
+                continue
+            mines = sentence.known_mines()
+            safes = sentence.known_safes()
+            if mines or safes:
+                self.knowledge.remove(ident)
+                # Copied becouse marking is changing the sentence's cells
+                for mine in set(mines or ()):
+                    self.mark_mine(mine)
+                for safe in set(safes or ()):
+                    self.mark_safe(safe)
+                continue
+            for other in self.knowledge.overlapping(ident):
+                if sentence.issubset(other):
+                    self.knowledge.add(other.difference(sentence))
+                elif other.issubset(sentence):
+                    self.knowledge.add(sentence.difference(other))
+
+    def infer_masks(self, ident, sentence):
+        # The same two inferances as inferance, on the masks of a BitSentence directly
+        mask, count = sentence.mask, sentence.count
+        if count == 0 or bin(mask).count("1") == count:
+            # All mines or all safes, marked in one pass over the knowledge
+            self.knowledge.remove(ident)
+            self.mark_mask(mask, mine=count > 0)
+            return
+        for other in self.knowledge.overlapping(ident):
+            if not mask & ~other.mask:
+                self.knowledge.add(BitSentence.from_mask(other.mask & ~mask, other.count - count, self.width))
+            elif not other.mask & ~mask:
+                self.knowledge.add(BitSentence.from_mask(mask & ~other.mask, count - other.count, self.width))
 
     def add_knowledge(self, cell, count):
         """
@@ -277,18 +607,15 @@ class MinesweeperAI():
         self.mark_safe(cell)
 
         # Adding a new sentence to the AI's knowledge base based on the value of `cell` and `count`
-        unknown_neighbors, concluded_count = self.unknwnneighbors(cell, count)
-        self.knowledge.append(Sentence(unknown_neighbors, concluded_count))
+        if self.bitmask:
+            mask, concluded_count = self.unknown_mask(cell, count)
+            self.knowledge.add(BitSentence.from_mask(mask, concluded_count, self.width))
+        else:
+            unknown_neighbors, concluded_count = self.unknwnneighbors(cell, count)
+            self.knowledge.add(self.new_sentence(unknown_neighbors, concluded_count))
 
-        '''
-        Making inferance until no inferance possible. (if previus knowledge = last knowledge it means we cant make any inferance)
-        It also calls updateknowledg function inside inferance so we are updating our knowledge at the same time
-        '''
-        while True:
-            currentbase = self.knowledge.copy()
-            self.inferance()
-            if currentbase == self.knowledge:
-                break
+        # Making inferance until no inferance possible, only new and changed sentences are looked at again
+        self.inferance()
 
         # For debugging
         # print("----------------------------------------------------------------------------------")
@@ -311,11 +638,8 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        if self.safes == set():
-            return None
-        for safemove in self.safes:
-            if not safemove in self.moves_made:
-                return safemove
+        # The smallest unplayed safe cell, so the move does not depend on the order of the safes set
+        return min(self.safes - self.moves_made, default=None)
 
     def make_random_move(self):
         """
@@ -0,0 +1,226 @@
+"""
+Times the PageRank functions on synthetic corpora and measures how far they are from a
+high-precision reference, writing the results to a JSON report that later runs can compare against.
+
+Usage: python benchmark.py [--sizes N ...] [--model MODEL] [--html] [--report FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import pagerank
+
+REPORT = "benchmark.json"
+# Tolerance of the reference ranks, far below the error of anything being measured
+REFERENCE_TOLERANCE = 1e-12
+# Options that change what is measured, reports are only compared when they agree on all of them
+COMPARED_OPTIONS = ("model", "links", "dangling", "seed", "samples")
+
+
+def timed(function, *args, **kwargs):
+    """
+    Returns (result, seconds) of one call.
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def generate_corpus(pages, model="web", links=8, dangling=0.05, seed=0):
+    """
+    Returns a synthetic corpus in the format of pagerank.crawl with `pages` pages named
+    "0.html", "1.html", ... and about `links` links per page, `dangling` of the pages without any.
+
+    "uniform": every link points to a page chosen uniformly at random.
+    "power-law": preferential attachment, a page is linked in proportion to the links it already
+    receives, which gives the heavy-tailed in-degrees of real link graphs.
+    "web": the copying model, every page picks a random earlier page and copies each of its links
+    with probability 1/2, otherwise links preferentially, which also gives clusters of similar pages.
+    """
+    if model not in MODELS:
+        raise ValueError(f"unknown model {model!r}, expected one of {', '.join(MODELS)}")
+    rng = random.Random(seed)
+    names = [f"{i}.html" for i in range(pages)]
+    targets = [[] for _ in range(pages)]
+    # Every link target once per link it received plus once for itself, for preferential choices
+    received = []
+    for page in range(pages):
+        received.append(page)
+        if rng.random() < dangling:
+            continue
+        # Preferential links can only go to pages generated before this one
+        available = pages - 1 if model == "uniform" else page
+        count = min(max(1, round(rng.expovariate(1 / links))), available)
+        chosen = set()
+        if model == "web" and page:
+            prototype = targets[rng.randrange(page)]
+            chosen.update(link for link in prototype if rng.random() < 0.5)
+        while len(chosen) < count:
+            if model == "uniform":
+                link = rng.randrange(pages)
+            else:
+                link = rng.choice(received)
+            if link != page:
+                chosen.add(link)
+        targets[page] = list(chosen)
+        received.extend(chosen)
+    return {names[page]: {names[link] for link in targets[page]} for page in range(pages)}
+
+
+MODELS = ("uniform", "power-law", "web")
+
+
+def write_corpus(corpus, directory):
+    """
+    Writes a corpus as one HTML file per page, in the format pagerank.crawl reads.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for page, links in corpus.items():
+        anchors = "".join(f'  <a href="{link}">{link}</a>\n' for link in sorted(links))
+        with open(os.path.join(directory, page), "w") as f:
+            f.write(f"<!DOCTYPE html>\n<html>\n<body>\n{anchors}</body>\n</html>\n")
+
+
+def reference_ranks(corpus):
+    """
+    Returns ranks computed to REFERENCE_TOLERANCE, with NumPy if available.
+    """
+    if pagerank.np is not None:
+        return pagerank.iterate_pagerank_numpy(corpus, pagerank.DAMPING, REFERENCE_TOLERANCE)
+    return pagerank.iterate_pagerank(corpus, pagerank.DAMPING, REFERENCE_TOLERANCE)
+
+
+def errors(ranks, reference):
+    """
+    Returns the L1 and largest single page distance of `ranks` from `reference`.
+    """
+    differences = [abs(ranks[page] - reference[page]) for page in reference]
+    return {"l1": sum(differences), "max": max(differences)}
+
+
+def run_size(pages, args):
+    """
+    Benchmarks one corpus size and returns its report entry.
+    """
+    corpus = generate_corpus(pages, args.model, args.links, args.dangling, args.seed)
+    entry = {"pages": pages, "links": sum(len(links) for links in corpus.values()), "timings": {}}
+    timings = entry["timings"]
+
+    if args.html:
+        with tempfile.TemporaryDirectory() as directory:
+            write_corpus(corpus, directory)
+            crawled, seconds = timed(pagerank.crawl, directory)
+            assert crawled == corpus, "crawl does not read back the generated corpus"
+            timings["crawl"] = {"seconds": seconds}
+            timings["crawl_cold_cache"] = {"seconds": timed(pagerank.crawl, directory, cache=True)[1]}
+            timings["crawl_warm_cache"] = {"seconds": timed(pagerank.crawl, directory, cache=True)[1]}
+
+    reference, seconds = timed(reference_ranks, corpus)
+    entry["reference_seconds"] = seconds
+
+    # The dict sampler is quadratic in the corpus size, so it is skipped beyond --sample-limit pages
+    functions = {"iterate_pagerank": lambda: pagerank.iterate_pagerank(corpus, pagerank.DAMPING)}
+    if pages <= args.sample_limit:
+        random.seed(args.seed)
+        functions["sample_pagerank"] = lambda: pagerank.sample_pagerank(corpus, pagerank.DAMPING, args.samples)
+    if pagerank.np is not None:
+        functions["iterate_pagerank_numpy"] = lambda: pagerank.iterate_pagerank_numpy(corpus, pagerank.DAMPING)
+        functions["sample_pagerank_numpy"] = lambda: pagerank.sample_pagerank_numpy(
+            corpus, pagerank.DAMPING, args.samples, seed=args.seed)
+    for name, function in functions.items():
+        ranks, seconds = min((timed(function) for _ in range(args.repeat)), key=lambda run: run[1])
+        timings[name] = {"seconds": seconds, "error": errors(ranks, reference)}
+    return entry
+
+
+def compare(report, baseline, slowdown):
+    """
+    Returns a line for every timing of `report` more than `slowdown` times slower than in
+    `baseline`, matched by corpus size and function name. Raises ValueError if the reports
+    were made with different COMPARED_OPTIONS, their timings are not comparable.
+    """
+    options, old_options = report.get("options", {}), baseline.get("options", {})
+    differences = [f"--{name} {old_options.get(name)} vs {options.get(name)}"
+                   for name in COMPARED_OPTIONS if options.get(name) != old_options.get(name)]
+    if differences:
+        raise ValueError(f"reports were made with different options: {', '.join(differences)}")
+    previous = {entry["pages"]: entry["timings"] for entry in baseline["results"]}
+    regressions = []
+    for entry in report["results"]:
+        for name, timing in entry["timings"].items():
+            old = previous.get(entry["pages"], {}).get(name)
+            if old and old["seconds"] > 0 and timing["seconds"] > slowdown * old["seconds"]:
+                regressions.append(f"{name} on {entry['pages']} pages: {old['seconds']:.3f}s -> "
+                                   f"{timing['seconds']:.3f}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmark.py")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000],
+                        help="numbers of pages of the generated corpora")
+    parser.add_argument("--model", choices=MODELS, default="web",
+                        help="how the links of the generated corpora are chosen")
+    parser.add_argument("--links", type=float, default=8,
+                        help="average number of links per page")
+    parser.add_argument("--dangling", type=float, default=0.05,
+                        help="fraction of pages without links")
+    parser.add_argument("--samples", type=int, default=pagerank.SAMPLES,
+                        help="number of pages the random surfer visits")
+    parser.add_argument("--sample-limit", type=int, default=1000,
+                        help="largest corpus sample_pagerank is timed on")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="runs per function, the fastest one is reported")
+    parser.add_argument("--html", action="store_true",
+                        help="also write the corpora as HTML files and time crawl on them")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", default=REPORT,
+                        help="file the JSON report is written to")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="earlier report to check the timings against")
+    parser.add_argument("--slowdown", type=float, default=1.5,
+                        help="how many times slower than in --compare counts as a regression")
+    args = parser.parse_args()
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": None if pagerank.np is None else pagerank.np.__version__,
+        "machine": platform.platform(),
+        "options": vars(args),
+        "results": [],
+    }
+    for pages in args.sizes:
+        entry = run_size(pages, args)
+        report["results"].append(entry)
+        print(f"{pages} pages, {entry['links']} links")
+        for name, timing in entry["timings"].items():
+            error = timing.get("error")
+            accuracy = f"  L1 error {error['l1']:.2e}, max {error['max']:.2e}" if error else ""
+            print(f"  {name:<24} {timing['seconds']:>9.3f}s{accuracy}")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare(report, baseline, args.slowdown)
+        except ValueError as error:
+            sys.exit(f"Cannot compare with {args.compare}: {error}")
+        for line in regressions:
+            print(f"Regression: {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
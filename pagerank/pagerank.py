@@ -1,10 +1,35 @@
+import argparse
+import json
 import os
 import random
 import re
 import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is only needed by the "numpy" engine, the dict based functions work without it
+    np = None
 
 DAMPING = 0.85
 SAMPLES = 10000
+# Largest change of any single page at which iterate_pagerank stops
+THRESHOLD = 0.001
+# L1 distance between successive rank vectors at which the NumPy engine stops
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 1000
+# Links extracted per file, reused by crawl(..., cache=True) while a file's mtime and size are unchanged
+CRAWL_CACHE = ".crawlcache.json"
+CRAWL_CACHE_VERSION = 1
+# Out-of-core corpora: links as int32 (source, target) pairs, page names in a text file next to them
+EDGE_NAMES = ".names"
+EDGE_DTYPE = "<i4"
+# Links per memory-mapped chunk an EdgeListMatrix reads at a time
+EDGE_CHUNK = 1 << 20
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
 
 # For fast debuging
 # if len(sys.argv) != 2:
@@ -13,36 +38,113 @@ SAMPLES = 10000
 
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
+    parser = argparse.ArgumentParser(prog="pagerank.py")
+    parser.add_argument("corpus")
+    parser.add_argument("--engine", choices=["dict", "numpy"], default="dict",
+                        help="compute PageRank with the original dict functions or with NumPy arrays")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="tolerance the numpy engine iterates to, measured in --norm")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="jacobi",
+                        help="iteration scheme of the numpy engine, aitken is usually slower than jacobi")
+    parser.add_argument("--norm", choices=sorted(NORMS), default="l1",
+                        help="norm of the change between iterations the numpy engine stops on")
+    parser.add_argument("--trace", action="store_true",
+                        help="print the residual and time of every numpy engine iteration")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"reuse the links of unchanged files from {CRAWL_CACHE} in the corpus directory")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of threads reading changed files")
+    parser.add_argument("--samples", type=int, default=SAMPLES,
+                        help="number of pages the random surfer visits")
+    parser.add_argument("--seed", type=int,
+                        help="random seed for the numpy engine's surfers")
+    parser.add_argument("--edges", metavar="FILE",
+                        help="write the links to FILE as a binary edge list and iterate over it "
+                             "in memory-mapped chunks instead of holding the corpus in memory")
+    parser.add_argument("--chunk", type=int, default=EDGE_CHUNK,
+                        help="links per memory-mapped chunk of --edges")
+    args = parser.parse_args()
+    if (args.engine == "numpy" or args.edges) and np is None:
+        sys.exit("The numpy engine needs NumPy installed.")
+    if args.edges and args.solver == "gauss-seidel":
+        parser.error("--edges cannot be solved with gauss-seidel")
+
+    if args.edges:
+        links = crawl_edges(args.corpus, args.edges, workers=args.workers)
+        matrix = EdgeListMatrix(args.edges, chunk=args.chunk)
+        print(f"{len(matrix)} pages, {links} links written to {args.edges}")
+        vector, trace = solve_pagerank(matrix, DAMPING, args.solver, args.norm, args.tolerance)
+        print(f"PageRank Results from Iteration ({len(trace)} iterations)")
+        for page, rank in zip(matrix.pages, vector.tolist()):
+            print(f"  {page}: {rank:.4f}")
+        return
+
+    corpus = crawl(args.corpus, cache=args.cache, workers=args.workers)
     print(corpus)
-    ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
-    print(f"PageRank Results from Sampling (n = {SAMPLES})")
+    if args.engine == "numpy":
+        ranks = sample_pagerank_numpy(corpus, DAMPING, args.samples, seed=args.seed)
+    else:
+        ranks = sample_pagerank(corpus, DAMPING, args.samples)
+    print(f"PageRank Results from Sampling (n = {args.samples})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
+    if args.engine == "numpy":
+        matrix = LinkMatrix(corpus)
+        vector, trace = solve_pagerank(matrix, DAMPING, args.solver, args.norm, args.tolerance)
+        ranks = matrix.ranks_dict(vector)
+        if args.trace:
+            print(f"Convergence of {args.solver} ({args.norm} norm)")
+            for entry in trace:
+                print(f"  {entry['iteration']:>4}: residual {entry['residual']:.3e} after {entry['seconds']:.4f}s")
+    else:
+        ranks = iterate_pagerank(corpus, DAMPING)
     print(f"PageRank Results from Iteration")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
 
 
-def crawl(directory):
+def crawl(directory, cache=False, workers=1):
     """
     Parse a directory of HTML pages and check for links to other pages.
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
+
+    With `cache`, the links of every file are remembered in CRAWL_CACHE together with
+    the file's mtime and size, and only new or changed files are read on the next crawl.
+    Files that have to be read are spread over `workers` threads.
     """
     pages = dict()
+    cached = read_crawl_cache(directory) if cache else {}
+    stats = dict()
+    changed = []
 
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+    # Reusing the links of files whose mtime and size did not change
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".html"):
+                continue
+            stat = entry.stat()
+            stats[entry.name] = [stat.st_mtime_ns, stat.st_size]
+            hit = cached.get(entry.name)
+            if hit is not None and hit[:2] == stats[entry.name]:
+                pages[entry.name] = set(hit[2])
+            else:
+                changed.append(entry.name)
+
+    # Extract all links from the other HTML files
+    paths = [os.path.join(directory, filename) for filename in changed]
+    if workers > 1 and len(paths) > 1:
+        with ThreadPoolExecutor(workers) as executor:
+            extracted = list(executor.map(extract_links, paths))
+    else:
+        extracted = [extract_links(path) for path in paths]
+    for filename, links in zip(changed, extracted):
+        pages[filename] = links - {filename}
+
+    if cache and (changed or len(cached) != len(pages)):
+        write_crawl_cache(directory, {
+            filename: stats[filename] + [sorted(links)] for filename, links in pages.items()
+        })
 
     # Only include links to other pages in the corpus
     for filename in pages:
@@ -54,6 +156,80 @@ def crawl(directory):
     return pages
 
 
+def extract_links(path):
+    """
+    Returns the set of link targets in one HTML file.
+    """
+    with open(path) as f:
+        return set(LINK.findall(f.read()))
+
+
+def read_crawl_cache(directory):
+    """
+    Returns the crawl cache of `directory` as {filename: [mtime_ns, size, links]}, empty if unusable.
+    """
+    try:
+        with open(os.path.join(directory, CRAWL_CACHE)) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != CRAWL_CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def write_crawl_cache(directory, files):
+    """
+    Writes the crawl cache of `directory`, replacing the old one in one step.
+    """
+    path = os.path.join(directory, CRAWL_CACHE)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "w") as f:
+            json.dump({"version": CRAWL_CACHE_VERSION, "files": files}, f)
+        os.replace(temporary, path)
+    except OSError:
+        # The cache only saves time, a read-only corpus just gets read in full next time
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def crawl_edges(directory, path, workers=1, batch=1024):
+    """
+    Crawls `directory` like crawl, but writes the links to `path` as int32 (source, target)
+    pairs of page numbers instead of returning them, and the page names, numbered in sorted
+    order, to `path` + EDGE_NAMES, one per line. Files are read `batch` at a time, so only
+    the links of one batch are ever in memory. Returns the number of links written.
+    """
+    pages = sorted(name for name in os.listdir(directory) if name.endswith(".html"))
+    index = {page: i for i, page in enumerate(pages)}
+    with open(path + EDGE_NAMES, "w") as f:
+        f.writelines(page + "\n" for page in pages)
+
+    written = 0
+    executor = ThreadPoolExecutor(workers) if workers > 1 else None
+    try:
+        with open(path, "wb") as f:
+            for first in range(0, len(pages), batch):
+                names = pages[first:first + batch]
+                paths = [os.path.join(directory, name) for name in names]
+                extracted = executor.map(extract_links, paths) if executor else map(extract_links, paths)
+                pairs = [
+                    (index[page], index[link])
+                    for page, links in zip(names, extracted)
+                    # Only include links to other pages in the corpus
+                    for link in links if link != page and link in index
+                ]
+                np.array(pairs, dtype=EDGE_DTYPE).reshape(-1, 2).tofile(f)
+                written += len(pairs)
+    finally:
+        if executor:
+            executor.shutdown()
+    return written
+
+
 '''
 Choosing site according to transition models pages likelihoods
 '''
@@ -128,19 +304,20 @@ def sample_pagerank(corpus, damping_factor, n):
     return counter
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, threshold=THRESHOLD):
     """
     Return PageRank values for each page by iteratively updating
-    PageRank values until convergence.
+    PageRank values until no page changes by more than `threshold`.
 
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
     popularity = dict()
+    pagescount = len(corpus)
     # Initially setting all pages likelihood equal
     for name in corpus.keys():
-        popularity[name] = 1/len(corpus)
+        popularity[name] = 1/pagescount
     # Updates pages popularity until they stabilize
     while True:
         # For detecting changes on pages popularities
@@ -154,18 +331,489 @@ def iterate_pagerank(corpus, damping_factor):
                     sum += popularity[iname]/len(corpus[iname])
                 # If page has no links, we can pretend like it has links to all pages that in the corpus, including itself
                 if len(corpus[iname]) == 0:
-                    sum += (popularity[iname]) / len(corpus)
+                    sum += (popularity[iname]) / pagescount
             # Updating pages popularity
-            popularity[pname] = ((1-damping_factor)/len(corpus))+(damping_factor*sum)
+            popularity[pname] = ((1-damping_factor)/pagescount)+(damping_factor*sum)
         # Substracting new popularities from old one for check differance
         differance = {key: popularity[key] - previus.get(key, 0) for key in popularity.keys()}
         # Checking if differance within the tolerance, if its ideal returning the popularity
         for value in differance.values():
-            if abs(value) > 0.001:
+            if abs(value) > threshold:
                 break
         else:
             return(popularity)
 
 
+class LinkMatrix():
+    """
+    Link structure of a corpus as NumPy arrays, built once and shared by the NumPy engines.
+
+    Pages are numbered in sorted order. Links are grouped by the page they point to,
+    so the rank every page receives through links is one gather and one segmented sum
+    instead of a scan over all pages.
+    """
+
+    def __init__(self, corpus):
+        self.pages = sorted(corpus)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        count = len(self.pages)
+        sources = np.fromiter((self.index[page] for page in self.pages for _ in corpus[page]),
+                              dtype=np.int64)
+        targets = np.fromiter((self.index[link] for page in self.pages for link in corpus[page]),
+                              dtype=np.int64, count=len(sources))
+        self.outdegree = np.bincount(sources, minlength=count)
+        # Links are generated page by page, so before sorting they are already grouped by source:
+        # the links of page i are self.links[self.linkstarts[i]:self.linkstarts[i] + self.outdegree[i]]
+        self.links = targets
+        self.linkstarts = np.cumsum(self.outdegree) - self.outdegree
+        # Pages without links count as linking to every page, their rank is spread by the caller
+        self.dangling = self.outdegree == 0
+
+        order = np.argsort(targets, kind="stable")
+        self.sources = sources[order]
+        self.targets = targets[order]
+        self.weights = 1 / self.outdegree[self.sources]
+        # Pages receiving at least one link, and where their links start in self.sources
+        inlinks = np.bincount(self.targets, minlength=count)
+        # The links into page i are self.sources[self.inptr[i]:self.inptr[i + 1]]
+        self.inptr = np.concatenate(([0], np.cumsum(inlinks)))
+        self.receivers = np.flatnonzero(inlinks)
+        self.starts = self.inptr[self.receivers]
+        # The same products as one SciPy sparse matrix, built by block_operator on the first block product
+        self.operator = None
+
+    def __len__(self):
+        return len(self.pages)
+
+    def multiply(self, ranks):
+        """
+        Returns the rank every page receives through links from `ranks`,
+        a vector or a matrix with one rank vector per column.
+        """
+        if ranks.ndim == 2:
+            operator = self.block_operator()
+            if operator is not None:
+                return operator @ ranks
+        shares = ranks[self.sources] * (self.weights if ranks.ndim == 1 else self.weights[:, None])
+        received = np.zeros_like(ranks)
+        if len(self.receivers):
+            received[self.receivers] = np.add.reduceat(shares, self.starts, axis=0)
+        return received
+
+    def block_operator(self):
+        """
+        Returns the links as a SciPy CSR matrix, much faster than NumPy for blocks of rank vectors,
+        or None without SciPy. It is a second copy of the links, so it is only built once a block
+        product needs it.
+        """
+        if self.operator is None:
+            try:
+                from scipy import sparse
+            except ImportError:
+                # Without SciPy plain NumPy does the block products too
+                self.operator = False
+            else:
+                count = len(self.pages)
+                self.operator = sparse.csr_matrix((self.weights, self.sources, self.inptr), shape=(count, count))
+        return None if self.operator is False else self.operator
+
+    def step(self, ranks, damping_factor, teleport):
+        """
+        One power iteration step. With probability `damping_factor` the surfer follows a link
+        (from a dangling page: jumps by `teleport`), otherwise it jumps by `teleport`.
+        """
+        jump = (1 - damping_factor) + damping_factor * ranks[self.dangling].sum(axis=0)
+        return damping_factor * self.multiply(ranks) + jump * teleport
+
+    def ranks_dict(self, ranks):
+        """
+        Returns a rank vector in the dict format of iterate_pagerank.
+        """
+        return dict(zip(self.pages, ranks.tolist()))
+
+
+class EdgeListMatrix(LinkMatrix):
+    """
+    The same interface as LinkMatrix over an edge list written by crawl_edges, for corpora
+    whose links do not fit in memory.
+
+    Only per-page arrays are kept in memory. Every product streams over the edge file in
+    memory-mapped chunks of `chunk` links, so peak memory depends on the number of pages
+    and the chunk size but not on the number of links.
+    """
+
+    def __init__(self, path, chunk=EDGE_CHUNK):
+        self.path = path
+        self.chunk = chunk
+        with open(path + EDGE_NAMES) as f:
+            self.pages = f.read().splitlines()
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        self.edges = os.path.getsize(path) // (2 * np.dtype(EDGE_DTYPE).itemsize)
+        count = len(self.pages)
+        self.outdegree = np.zeros(count, dtype=np.int64)
+        for edges in self.chunks():
+            self.outdegree += np.bincount(edges[:, 0], minlength=count)
+        self.dangling = self.outdegree == 0
+        self.share = 1 / np.maximum(self.outdegree, 1)
+
+    def chunks(self):
+        """
+        Yields the edge list as memory-mapped (links, 2) arrays of at most self.chunk links,
+        each one unmapped before the next is mapped.
+        """
+        pair = 2 * np.dtype(EDGE_DTYPE).itemsize
+        for first in range(0, self.edges, self.chunk):
+            edges = np.memmap(self.path, dtype=EDGE_DTYPE, mode="r", offset=first * pair,
+                              shape=(min(self.chunk, self.edges - first), 2))
+            yield edges
+            del edges
+
+    def multiply(self, ranks):
+        """
+        Returns the rank every page receives through links from `ranks`,
+        a vector or a matrix with one rank vector per column.
+        """
+        if ranks.ndim == 2:
+            return np.column_stack([self.multiply(column) for column in ranks.T])
+        shares = ranks * self.share
+        received = np.zeros(len(self.pages))
+        for edges in self.chunks():
+            received += np.bincount(edges[:, 1], weights=shares[edges[:, 0]], minlength=len(received))
+        return received
+
+
+def power_iteration(matrix, damping_factor, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS, start=None):
+    """
+    Iterates the PageRank equation over a LinkMatrix from `start` (default the uniform vector)
+    until the L1 distance between successive rank vectors is below `tolerance`.
+    Returns (rank vector, number of iterations).
+    """
+    ranks, trace = solve_pagerank(matrix, damping_factor, "jacobi", "l1", tolerance, max_iterations, start)
+    return ranks, len(trace)
+
+
+# Norms the solvers can measure the change between iterations in
+NORMS = {
+    "l1": lambda change: np.abs(change).sum(),
+    "l2": lambda change: np.sqrt((change * change).sum()),
+    "linf": lambda change: np.abs(change).max(),
+}
+
+
+def solve_pagerank(matrix, damping_factor, solver="jacobi", norm="l1", tolerance=TOLERANCE,
+                   max_iterations=MAX_ITERATIONS, start=None, period=10):
+    """
+    Solves PageRank over a LinkMatrix with one of the SOLVERS, from `start` (default the
+    uniform vector) until the `norm` of the change between iterations is below `tolerance`.
+
+    Returns (rank vector, trace) where the trace has one dict per iteration with its
+    "iteration" number, "residual" (the norm of the change) and "seconds" since the start.
+    `period` is how many iterations the extrapolation solvers run between extrapolations.
+    """
+    count = len(matrix)
+    teleport = np.full(count, 1 / count)
+    ranks = teleport.copy() if start is None else np.array(start, dtype=float)
+    measure = NORMS[norm]
+    sweep = SOLVERS[solver](matrix, damping_factor, teleport, period)
+    trace = []
+    started = time.perf_counter()
+    for iteration in range(1, max_iterations + 1):
+        updated = sweep(ranks)
+        residual = measure(updated - ranks)
+        ranks = updated
+        trace.append({"iteration": iteration, "residual": float(residual),
+                      "seconds": time.perf_counter() - started})
+        if residual < tolerance:
+            break
+    return ranks / ranks.sum(), trace
+
+
+def jacobi(matrix, damping_factor, teleport, period):
+    """
+    Power iteration: every page is updated from the previous iteration's vector.
+    """
+    return lambda ranks: matrix.step(ranks, damping_factor, teleport)
+
+
+def gauss_seidel(matrix, damping_factor, teleport, period):
+    """
+    Pages are updated in order, each one already using the new values of the pages before it.
+    In-order updates do not keep the ranks summing to 1, so every sweep is rescaled to sum 1,
+    otherwise that error decays slowly. Usually converges in fewer iterations than jacobi,
+    but each sweep is a Python loop over pages.
+    """
+    if isinstance(matrix, EdgeListMatrix):
+        raise ValueError("gauss-seidel needs the in-links of a LinkMatrix, not an edge list")
+    # Plain lists, indexing NumPy arrays one element at a time would be slower
+    inptr = matrix.inptr.tolist()
+    sources = matrix.sources.tolist()
+    share = (1 / np.maximum(matrix.outdegree, 1)).tolist()
+    dangling = matrix.dangling.tolist()
+    count = len(matrix)
+    jump = (1 - damping_factor) / count
+
+    def sweep(ranks):
+        ranks = ranks.tolist()
+        # Rank of pages without links, spread over every page and kept current as they change
+        spread = sum(rank for rank, empty in zip(ranks, dangling) if empty)
+        for page in range(count):
+            received = 0
+            for k in range(inptr[page], inptr[page + 1]):
+                source = sources[k]
+                received += ranks[source] * share[source]
+            value = jump + damping_factor * (received + spread / count)
+            if dangling[page]:
+                spread += value - ranks[page]
+            ranks[page] = value
+        ranks = np.array(ranks)
+        return ranks / ranks.sum()
+    return sweep
+
+
+def aitken(matrix, damping_factor, teleport, period):
+    """
+    Power iteration with componentwise Aitken delta-squared extrapolation every `period` iterations.
+    The second eigenvalue of a link matrix is rarely isolated enough for that, so on most
+    corpora this needs more iterations than jacobi, kept for comparison with quadratic.
+    """
+    history = []
+
+    def sweep(ranks):
+        updated = matrix.step(ranks, damping_factor, teleport)
+        history[:] = (history + [updated])[-3:]
+        if len(history) == 3 and sweep.count % period == 0:
+            first, second, third = history
+            curvature = third - 2 * second + first
+            safe = np.abs(curvature) > 1e-15
+            extrapolated = third.copy()
+            extrapolated[safe] = third[safe] - (third[safe] - second[safe]) ** 2 / curvature[safe]
+            updated = normalize(extrapolated, third)
+            history.clear()
+        sweep.count += 1
+        return updated
+    sweep.count = 1
+    return sweep
+
+
+def quadratic(matrix, damping_factor, teleport, period):
+    """
+    Power iteration with quadratic extrapolation (Kamvar et al.) every `period` iterations,
+    which removes the two largest non-principal eigenvector components from the last four iterates.
+    """
+    history = []
+
+    def sweep(ranks):
+        updated = matrix.step(ranks, damping_factor, teleport)
+        history[:] = (history + [updated])[-4:]
+        if len(history) == 4 and sweep.count % period == 0:
+            oldest, older, old, current = history
+            changes = np.column_stack((older - oldest, old - oldest))
+            gamma, *_ = np.linalg.lstsq(changes, -(current - oldest), rcond=None)
+            beta = (gamma[0] + gamma[1] + 1, gamma[1] + 1, 1)
+            updated = normalize(beta[0] * older + beta[1] * old + beta[2] * current, current)
+            history.clear()
+        sweep.count += 1
+        return updated
+    sweep.count = 1
+    return sweep
+
+
+def normalize(extrapolated, fallback):
+    """
+    Returns an extrapolated rank vector clipped to non-negative values and rescaled to sum 1,
+    or `fallback` if the extrapolation broke down.
+    """
+    extrapolated = np.clip(extrapolated, 0, None)
+    total = extrapolated.sum()
+    if not np.isfinite(total) or total <= 0:
+        return fallback
+    return extrapolated / total
+
+
+# Iteration schemes of solve_pagerank, each builds a function from one rank vector to the next
+SOLVERS = {
+    "jacobi": jacobi,
+    "gauss-seidel": gauss_seidel,
+    "aitken": aitken,
+    "quadratic": quadratic,
+}
+
+
+def iterate_pagerank_numpy(corpus, damping_factor, tolerance=TOLERANCE, solver="jacobi", norm="l1"):
+    """
+    Same result format as iterate_pagerank, computed with NumPy over a LinkMatrix
+    and iterated with `solver` until successive rank vectors are within `tolerance` in `norm`.
+    """
+    matrix = LinkMatrix(corpus)
+    ranks, _ = solve_pagerank(matrix, damping_factor, solver, norm, tolerance)
+    return matrix.ranks_dict(ranks)
+
+
+def sample_pagerank_numpy(corpus, damping_factor, n, walkers=None, seed=None):
+    """
+    Same result format as sample_pagerank, estimated by many independent random surfers
+    advanced together with NumPy, `n` page visits in total.
+
+    Each surfer starts on a page chosen at random and then, as described in transition_model,
+    follows one of its page's links with probability `damping_factor` or jumps to a page chosen
+    at random from the whole corpus (always from pages without links). Links are picked by
+    indexing the page's slice of LinkMatrix.links, so a step costs O(1) per surfer instead of
+    rebuilding an N entry transition model. `seed` makes the estimate reproducible.
+    """
+    matrix = LinkMatrix(corpus)
+    count = len(matrix)
+    rng = np.random.default_rng(seed)
+    if walkers is None:
+        # Long enough walks that the random starting pages hardly matter, as many walkers as that allows
+        walkers = min(10000, n // 1000)
+    walkers = max(1, min(walkers, n))
+
+    visits = np.zeros(count, dtype=np.int64)
+    # Visited pages are buffered and counted a block at a time, counting every step would cost O(N) each
+    block = max(1, min(1024, (1 << 20) // walkers))
+    trace = np.empty((block, walkers), dtype=np.int64)
+    current = rng.integers(count, size=walkers)
+    remaining = n
+    while remaining > 0:
+        rows = 0
+        while rows < block and remaining > 0:
+            trace[rows] = current
+            rows += 1
+            remaining -= walkers
+            follow = (rng.random(walkers) < damping_factor) & ~matrix.dangling[current]
+            jumps = rng.integers(count, size=walkers)
+            if len(matrix.links):
+                choices = (rng.random(walkers) * matrix.outdegree[current]).astype(np.int64)
+                positions = np.where(follow, matrix.linkstarts[current] + choices, 0)
+                current = np.where(follow, matrix.links[positions], jumps)
+            else:
+                current = jumps
+        visited = trace[:rows].ravel()
+        if remaining < 0:
+            # The last step had more surfers than visits left to count
+            visited = visited[:remaining]
+        visits += np.bincount(visited, minlength=count)
+    return matrix.ranks_dict(visits / n)
+
+
+def update_pagerank(corpus, ranks, damping_factor, added_pages=(), removed_pages=(), added_links=(),
+                    removed_links=(), tolerance=TOLERANCE, compare=True):
+    """
+    Applies a crawl delta to `corpus` in place and recomputes PageRank warm-started from
+    `ranks`, the previous result dict. Links are given as (page, link) pairs.
+
+    Returns (ranks dict, report) where the report holds the "iterations" and "seconds" the
+    warm start took and, with `compare`, the "cold_iterations" and "cold_seconds" of a solve
+    from the uniform vector and the iterations "saved" by warm-starting.
+    """
+    removed = set(removed_pages)
+    for page in removed:
+        corpus.pop(page, None)
+    if removed:
+        for links in corpus.values():
+            links -= removed
+    for page in added_pages:
+        corpus.setdefault(page, set())
+    for page, link in removed_links:
+        if page in corpus:
+            corpus[page].discard(link)
+    for page, link in added_links:
+        # Same rules as crawl: no links to itself or to pages outside the corpus
+        if page in corpus and link in corpus and link != page:
+            corpus[page].add(link)
+
+    matrix = LinkMatrix(corpus)
+    count = len(matrix)
+    start = np.array([ranks.get(page, 1 / count) for page in matrix.pages])
+    start /= start.sum()
+
+    report = dict()
+    started = time.perf_counter()
+    updated, report["iterations"] = power_iteration(matrix, damping_factor, tolerance, start=start)
+    report["seconds"] = time.perf_counter() - started
+    if compare:
+        started = time.perf_counter()
+        _, report["cold_iterations"] = power_iteration(matrix, damping_factor, tolerance)
+        report["cold_seconds"] = time.perf_counter() - started
+        report["saved"] = report["cold_iterations"] - report["iterations"]
+    return matrix.ranks_dict(updated), report
+
+
+def teleport_matrix(matrix, seeds):
+    """
+    Returns a (len(seeds), N) array of teleport distributions for personalized_pagerank.
+    Each entry of `seeds` is a dict of page weights or a collection of pages weighted equally.
+    """
+    teleports = np.zeros((len(seeds), len(matrix)))
+    for row, seed in enumerate(seeds):
+        weights = seed if isinstance(seed, dict) else dict.fromkeys(seed, 1)
+        for page, weight in weights.items():
+            teleports[row, matrix.index[page]] += weight
+    totals = teleports.sum(axis=1, keepdims=True)
+    if (totals <= 0).any():
+        raise ValueError("every teleport distribution needs at least one page with positive weight")
+    return teleports / totals
+
+
+def personalized_pagerank(matrix, damping_factor, teleports, tolerance=TOLERANCE,
+                          max_iterations=MAX_ITERATIONS, block=64):
+    """
+    Computes personalized PageRank for every row of `teleports`, a (k, N) array of teleport
+    distributions over matrix.pages (see teleport_matrix), and returns a (k, N) array of ranks.
+
+    The surfer jumps by its row's distribution instead of uniformly, also from pages without links.
+    Rows are solved `block` at a time as the columns of one matrix, so every power iteration
+    step reads the shared link structure once for the whole block. A block stops once every
+    column moved less than `tolerance` in L1 distance.
+    """
+    teleports = np.asarray(teleports, dtype=float)
+    ranks = np.empty_like(teleports)
+    for first in range(0, len(teleports), block):
+        columns = teleports[first:first + block].T.copy()
+        current = columns.copy()
+        for _ in range(max_iterations):
+            updated = matrix.step(current, damping_factor, columns)
+            residual = np.abs(updated - current).sum(axis=0).max()
+            current = updated
+            if residual < tolerance:
+                break
+        ranks[first:first + block] = current.T
+    return ranks
+
+
+def push_pagerank(corpus, seed, damping_factor, epsilon=1e-6):
+    """
+    Approximates personalized PageRank with all teleports going to `seed`, touching only
+    the pages around it: residual probability is pushed along links until every page's
+    residual is below `epsilon` times its number of links. Pages without links send
+    their pushed probability back to the seed, matching personalized_pagerank.
+
+    Returns a dict of the pages reached and their approximate rank, each an underestimate
+    by at most `epsilon` times the links of the pages with residual left.
+    """
+    ranks = dict()
+    residual = {seed: 1.0}
+    queue = deque([seed])
+    queued = {seed}
+    while queue:
+        page = queue.popleft()
+        queued.discard(page)
+        mass = residual[page]
+        links = corpus[page]
+        if mass < epsilon * max(len(links), 1):
+            continue
+        ranks[page] = ranks.get(page, 0) + (1 - damping_factor) * mass
+        residual[page] = 0.0
+        # Pages without links continue at the seed, like a teleport
+        targets = links if links else (seed,)
+        share = damping_factor * mass / len(targets)
+        for target in targets:
+            residual[target] = residual.get(target, 0.0) + share
+            if target not in queued and residual[target] >= epsilon * max(len(corpus[target]), 1):
+                queue.append(target)
+                queued.add(target)
+    return ranks
+
+
 if __name__ == "__main__":
     main()
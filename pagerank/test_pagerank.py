@@ -0,0 +1,41 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import benchmark  # noqa: E402
+import pagerank  # noqa: E402
+
+
+def exact_ranks(corpus, damping_factor):
+    """
+    Returns PageRank of `corpus` in sorted page order by solving the linear system directly.
+    """
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    count = len(pages)
+    # transition[j, i] is the probability of following a link from page i to page j
+    transition = np.zeros((count, count))
+    for page, links in corpus.items():
+        targets = [index[link] for link in links] if links else range(count)
+        for target in targets:
+            transition[target, index[page]] += 1 / len(targets)
+    system = np.eye(count) - damping_factor * transition
+    return np.linalg.solve(system, np.full(count, (1 - damping_factor) / count))
+
+
+@pytest.mark.parametrize("model", benchmark.MODELS)
+@pytest.mark.parametrize("solver", sorted(pagerank.SOLVERS))
+def test_solvers_reach_the_exact_ranks(model, solver):
+    corpus = benchmark.generate_corpus(300, model, dangling=0.1, seed=1)
+    expected = exact_ranks(corpus, pagerank.DAMPING)
+    matrix = pagerank.LinkMatrix(corpus)
+    ranks, trace = pagerank.solve_pagerank(matrix, pagerank.DAMPING, solver, tolerance=1e-10)
+    assert trace[-1]["residual"] < 1e-10
+    assert np.abs(ranks - expected).sum() < 1e-8
+
+
+def test_iterate_pagerank_matches_numpy_engine():
+    corpus = benchmark.generate_corpus(60, "web", dangling=0.1, seed=2)
+    ranks = pagerank.iterate_pagerank(corpus, pagerank.DAMPING)
+    expected = dict(zip(sorted(corpus), exact_ranks(corpus, pagerank.DAMPING)))
+    assert max(abs(ranks[page] - expected[page]) for page in corpus) < 0.01
@@ -0,0 +1,31 @@
+import pytest
+
+import tictactoe
+from tictactoe import Search, Variant, bit_result, root_parallel
+
+
+# Opening moves played before searching, as cells of the board
+OPENINGS = [(), (0,), (0, 5)]
+
+
+@pytest.mark.parametrize("size", [(3, 3, 3), (4, 4, 3), (5, 5, 4), (6, 6, 4)])
+@pytest.mark.parametrize("opening", OPENINGS)
+def test_root_parallel_matches_serial_search(size, opening):
+    variant = Variant(*size)
+    bits = (0, 0)
+    for move in opening:
+        bits = bit_result(bits, move)
+    depth = 3
+    serial = Search(variant, max_depth=depth)
+    move = serial.best_move(bits)
+    for _ in range(2):
+        parallel = Search(variant, max_depth=depth)
+        assert root_parallel(parallel, bits, 2) == move
+        assert parallel.score == serial.score
+
+
+def test_alphabeta_processes_agree():
+    variant = Variant(4, 4, 3)
+    board = tictactoe.initial_state(variant)
+    serial = tictactoe.alphabeta(board, variant, budget=None, max_depth=2)
+    assert tictactoe.alphabeta(board, variant, budget=None, max_depth=2, processes=2) == serial
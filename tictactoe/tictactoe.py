@@ -2,20 +2,112 @@
 Tic Tac Toe Player
 """
 
+import argparse
+import json
 import math
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from array import array
 
 X = "X"
 O = "O"
 EMPTY = None
 
 
-def initial_state():
+class Variant():
+    """
+    Board size and win length of an m,n,k game, `k` in a row on a `rows` x `columns` board wins,
+    with the bit masks the bitboard functions and the search use precomputed.
+
+    Bitboards are (x, o) pairs of masks, bit row * columns + column set where that player has played.
+    """
+
+    def __init__(self, rows=3, columns=3, k=3):
+        if rows < 1 or columns < 1 or not 1 <= k <= max(rows, columns):
+            raise ValueError(f"no {k} in a row fits on a {rows}x{columns} board")
+        self.rows = rows
+        self.columns = columns
+        self.k = k
+        self.cells = rows * columns
+        self.full = (1 << self.cells) - 1
+        # Masks of every k cells in a row, column or diagonal
+        wins = []
+        for row in range(rows):
+            for column in range(columns):
+                for (down, right) in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    last_row, last_column = row + down * (k - 1), column + right * (k - 1)
+                    if 0 <= last_row < rows and 0 <= last_column < columns:
+                        wins.append(sum(1 << ((row + down * i) * columns + column + right * i) for i in range(k)))
+        self.wins = tuple(wins)
+        # Win lines through every cell, only these can be completed by a move there
+        self.lines = tuple(tuple(line for line in wins if line >> cell & 1) for cell in range(self.cells))
+        # Cells on the most win lines first, the order the search tries moves in before it learns better
+        self.order = tuple(sorted(range(self.cells), key=lambda cell: -len(self.lines[cell])))
+        # Position of every cell in self.order, equal root scores are decided by it
+        self.rank = tuple(self.order.index(cell) for cell in range(self.cells))
+
+    # Variants are equal by their shape, also after being pickled to a worker process
+    def __eq__(self, other):
+        return isinstance(other, Variant) and (self.rows, self.columns, self.k) == (other.rows, other.columns, other.k)
+
+    def __hash__(self):
+        return hash((self.rows, self.columns, self.k))
+
+
+CLASSIC = Variant(3, 3, 3)
+
+
+def symmetries():
+    """
+    Returns the 8 rotations and reflections of the board, each as the tuple of flat cell
+    indices (3 * row + column) the cells of the transformed board are taken from.
+    """
+    found = []
+    cells = [(row, column) for row in range(3) for column in range(3)]
+    for reflect in (False, True):
+        for turns in range(4):
+            mapping = []
+            for (row, column) in cells:
+                if reflect:
+                    column = 2 - column
+                for _ in range(turns):
+                    row, column = column, 2 - row
+                mapping.append(3 * row + column)
+            found.append(tuple(mapping))
+    return tuple(found)
+
+
+SYMMETRIES = symmetries()
+# Every 9-bit mask transformed by each symmetry, so a bitboard is transformed with two lookups
+TRANSFORMED = tuple(
+    tuple(sum(1 << cell for cell, source in enumerate(mapping) if mask >> source & 1) for mask in range(CLASSIC.full + 1))
+    for mapping in SYMMETRIES
+)
+# Minimax values of every position searched so far, by canonical key, kept across calls
+transpositions = {}
+# Positions bit_value visited, searches it cut short and transposition hits, since the module was loaded
+counters = {"nodes": 0, "cutoffs": 0, "hits": 0}
+
+# Perfect play table written by build_table: a header of magic, format version and key count,
+# the canonical keys as little-endian uint32, then one byte per key holding
+# (value + 1) << 4 | best move, with the move in the orientation of the canonical key
+TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tictactoe.table")
+TABLE_HEADER = struct.Struct("<8sII")
+TABLE_MAGIC = b"TTTTABLE"
+# Changed whenever the keys or the packed bytes are encoded differently, older tables are ignored
+TABLE_VERSION = 2
+# {canonical key: packed value and move} once loaded, False if there is no usable table
+table = None
+
+
+def initial_state(variant=CLASSIC):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * variant.columns for _ in range(variant.rows)]
 
 
 def player(board):
@@ -23,29 +115,15 @@ def player(board):
     Returns player who has the next turn on a board.
     If count of X equals to O in the board then its x's turn
     """
-    xcounter = 0
-    ocounter = 0
-    for row in range(3):
-        for column in range(3):
-            if board[row][column] == X:
-                xcounter += 1
-            elif board[row][column] == O:
-                ocounter += 1
-    return X if xcounter == ocounter else O
+    return bit_player(to_bitboard(board))
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
-    Checking all board if there is no X or O on that specific coordinate,
-    adding it to possible moves
     """
-    possible_moves = set()
-    for row in range(3):
-        for column in range(3):
-            if board[row][column] == EMPTY:
-                possible_moves.add((row, column))
-    return possible_moves
+    columns = len(board[0])
+    return set(divmod(move, columns) for move in range(len(board) * columns) if board[move // columns][move % columns] == EMPTY)
 
 
 def result(board, action):
@@ -56,121 +134,648 @@ def result(board, action):
     # Checking If move already made
     if board[x][y] != EMPTY:
         raise IndexError()
-    # Look
     resultboard = [i[:] for i in board]
     resultboard[x][y] = player(board)
     return resultboard
 
 
-def winner(board):
+def winner(board, variant=CLASSIC):
     """
     Returns the winner of the game, if there is one.
     """
-    # Checking 3 in a row
-    for row in range(3):
-        if board[row][0] == board[row][1] and board[row][1] == board[row][2]:
-            return board[row][1]
-    # Checking 3 in a column
-    for column in range(3):
-        if board[0][column] == board[1][column] and board[1][column] == board[2][column]:
-            return board[1][column]
-    # Checking left top to right bottom cross
-    if board[0][0] == board[1][1] and board[1][1] == board[2][2]:
-        return board[1][1]
-    # Checking right top to left bottom cross
-    if board[0][2] == board[1][1] and board[1][1] == board[2][0]:
-        return board[1][1]
+    return bit_winner(to_bitboard(board), variant)
 
 
-def terminal(board):
+def terminal(board, variant=CLASSIC):
     """
     Returns True if game is over, False otherwise.
     """
-    # Getting winner if there is one
-    take = winner(board)
-    if take == X or take == O:
-        return True
-    # Checking if there is empty space in board
-    for row in range(3):
-        for column in range(3):
-            if board[row][column] == EMPTY:
-                return False
-    # If no winner and no empty space then it's tie
-    return True
+    return bit_terminal(to_bitboard(board), variant)
 
 
-def utility(board):
+def utility(board, variant=CLASSIC):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    localwinner = winner(board)
-    if localwinner == X:
-        return 1
-    elif localwinner == O:
-        return -1
-    return 0
+    return bit_utility(to_bitboard(board), variant)
+
+
+def to_bitboard(board):
+    """
+    Returns the (x, o) bitboard of a list of lists board.
+    """
+    x = o = 0
+    columns = len(board[0])
+    for row in range(len(board)):
+        for column in range(columns):
+            if board[row][column] == X:
+                x |= 1 << (columns * row + column)
+            elif board[row][column] == O:
+                o |= 1 << (columns * row + column)
+    return (x, o)
+
+
+def from_bitboard(bits, variant=CLASSIC):
+    """
+    Returns the list of lists board of an (x, o) bitboard.
+    """
+    (x, o) = bits
+    columns = variant.columns
+    return [[X if x >> (columns * row + column) & 1 else O if o >> (columns * row + column) & 1 else EMPTY
+             for column in range(columns)]
+            for row in range(variant.rows)]
+
+
+def bit_player(bits):
+    """
+    Returns player who has the next turn on a bitboard.
+    """
+    (x, o) = bits
+    return X if bin(x).count("1") == bin(o).count("1") else O
+
+
+def bit_actions(bits, variant=CLASSIC):
+    """
+    Returns the list of empty cells (row * columns + column) of a bitboard in order.
+    """
+    empty = variant.full & ~(bits[0] | bits[1])
+    return [move for move in range(variant.cells) if empty >> move & 1]
+
+
+def bit_result(bits, move):
+    """
+    Returns the bitboard after the next player plays cell `move`.
+    """
+    (x, o) = bits
+    if (x | o) >> move & 1:
+        raise IndexError()
+    if bit_player(bits) == X:
+        return (x | 1 << move, o)
+    return (x, o | 1 << move)
+
+
+def bit_winner(bits, variant=CLASSIC):
+    """
+    Returns the winner of a bitboard, if there is one.
+    """
+    (x, o) = bits
+    for line in variant.wins:
+        if x & line == line:
+            return X
+        if o & line == line:
+            return O
+    return None
+
+
+def bit_terminal(bits, variant=CLASSIC):
+    """
+    Returns True if the game on a bitboard is over.
+    """
+    return bit_winner(bits, variant) is not None or bits[0] | bits[1] == variant.full
+
+
+def bit_utility(bits, variant=CLASSIC):
+    """
+    Returns 1 if X has won the game on a bitboard, -1 if O has won, 0 otherwise.
+    """
+    won = bit_winner(bits, variant)
+    return 1 if won == X else -1 if won == O else 0
+
+
+def canonical(bits):
+    """
+    Returns the key of a bitboard shared by all its rotations and reflections:
+    the smallest of their x << 9 | o values.
+    """
+    (x, o) = bits
+    return min(table[x] << 9 | table[o] for table in TRANSFORMED)
+
+
+def orient(bits):
+    """
+    Returns (canonical key, symmetry index) of a bitboard, the symmetry being the one
+    that turns the bitboard into its canonical orientation.
+    """
+    (x, o) = bits
+    return min((transformed[x] << 9 | transformed[o], index) for index, transformed in enumerate(TRANSFORMED))
 
 
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
+    bits = to_bitboard(board)
     # If game is over, stop
-    if terminal(board):
+    if bit_terminal(bits):
         return None
+    # Answering from the perfect play table if there is one
+    if load_table():
+        key, symmetry = orient(bits)
+        packed = table.get(key)
+        if packed is not None:
+            # Cell c of the canonical board is cell SYMMETRIES[symmetry][c] of this one
+            return divmod(SYMMETRIES[symmetry][packed & 15], 3)
+    return divmod(bit_minimax(bits), 3)
+
+
+def load_table(path=TABLE):
+    """
+    Loads the perfect play table on first use. Returns False if it is missing or unusable,
+    then minimax searches instead.
+    """
+    global table
+    if table is None:
+        table = False
+        try:
+            with open(path, "rb") as f:
+                magic, version, count = TABLE_HEADER.unpack(f.read(TABLE_HEADER.size))
+                if magic != TABLE_MAGIC or version != TABLE_VERSION:
+                    return table
+                keys = table_keys()
+                keys.fromfile(f, count)
+                packed = f.read(count)
+        except (OSError, EOFError, struct.error):
+            return table
+        if len(packed) == count:
+            if sys.byteorder == "big":
+                keys.byteswap()
+            table = dict(zip(keys, packed))
+    return table
 
-    elif player(board) == X:
-        arr = []
-        for action in actions(board):
-            # Thinking about what my rival will make if i do that move
-            rival = minvalue(result(board, action))
-            # If i could certainly win with this move there is no need to explore others
-            if rival == 1:
-                return action
-            # If i cant win certainly then looking other moves that I can make
-            # Appends to array contains rival != 1 values
-            arr.append([rival, action])
-        # If i'm here it means there is no winning chance in optimal game so we play for a tie
-        for i in arr:
-            if i[0] == 0:
-                return i[1]
-
-    elif player(board) == O:
-        arr = []
-        for action in actions(board):
-            rival = maxvalue(result(board, action))
-            if rival == -1:
-                return action
-            arr.append([rival, action])
-        for i in arr:
-            if i[0] == 0:
-                return i[1]
 
+def table_keys(keys=()):
+    """
+    Returns an array of native 32 bit unsigned ints for the keys of the perfect play table.
+    """
+    for typecode in "IL":
+        if array(typecode).itemsize == 4:
+            return array(typecode, keys)
+    raise RuntimeError("no 32 bit unsigned array type on this platform")
 
-def maxvalue(board):
-    # If game is over, stop
-    if terminal(board):
-        return utility(board)
-    v = -500
-    for action in actions(board):
+
+def build_table(path=TABLE):
+    """
+    Solves every reachable position that is not over and writes the perfect play table to `path`.
+    Returns the number of canonical positions written.
+    """
+    solved = {}
+    stack = [(0, 0)]
+    while stack:
+        bits = stack.pop()
+        if bit_terminal(bits):
+            continue
+        key = canonical(bits)
+        if key in solved:
+            continue
+        # Solving the position in its canonical orientation, so the move needs no translation
+        canonical_bits = (key >> 9, key & CLASSIC.full)
+        move = bit_minimax(canonical_bits)
+        solved[key] = (bit_value(canonical_bits) + 1) << 4 | move
+        stack.extend(bit_result(bits, move) for move in bit_actions(bits))
+
+    keys = sorted(solved)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(keys)))
+        encoded = table_keys(keys)
+        if sys.byteorder == "big":
+            encoded.byteswap()
+        encoded.tofile(f)
+        f.write(bytes(solved[key] for key in keys))
+    os.replace(temporary, path)
+    return len(keys)
+
+
+def bit_minimax(bits):
+    """
+    Returns the optimal cell (3 * row + column) for the current player on a bitboard
+    that is not terminal.
+    """
+    arr = []
+    best = 1 if bit_player(bits) == X else -1
+    for move in bit_actions(bits):
         # Thinking about what my rival will make if i do that move
-        rival = minvalue(result(board, action))
+        rival = bit_value(bit_result(bits, move))
         # If i could certainly win with this move there is no need to explore others
-        if rival == 1:
-            return 1
-        # If rival rival bigger than current v we updating v becouse we need max value
-        v = max(v, rival)
-    # If i'm here it means there is no winning chance in optimal game so we play for a tie
-    return v
+        if rival == best:
+            return move
+        arr.append([rival, move])
+    # If i'm here it means there is no winning chance in optimal game so we play for a tie,
+    # or if every move loses, any move
+    if best == 1:
+        return max(arr, key=lambda i: i[0])[1]
+    return min(arr, key=lambda i: i[0])[1]
+
+
+def maxvalue(board):
+    return bit_value(to_bitboard(board))
 
 
 def minvalue(board):
-    if terminal(board):
-        return utility(board)
-    v = 500
-    for action in actions(board):
-        rival = maxvalue(result(board, action))
-        if rival == -1:
-            return -1
-        v = min(v, rival)
+    return bit_value(to_bitboard(board))
+
+
+def bit_value(bits):
+    """
+    Returns the minimax value of a bitboard: 1 if X wins with optimal play, -1 if O wins, 0 for a tie.
+    """
+    counters["nodes"] += 1
+    # If game is over, stop
+    if bit_terminal(bits):
+        return bit_utility(bits)
+    # Same position or one of its rotations or reflections already searched
+    key = canonical(bits)
+    if key in transpositions:
+        counters["hits"] += 1
+        return transpositions[key]
+    if bit_player(bits) == X:
+        v = -500
+        for move in bit_actions(bits):
+            v = max(v, bit_value(bit_result(bits, move)))
+            # If X could certainly win with this move there is no need to explore others
+            if v == 1:
+                counters["cutoffs"] += 1
+                break
+    else:
+        v = 500
+        for move in bit_actions(bits):
+            v = min(v, bit_value(bit_result(bits, move)))
+            if v == -1:
+                counters["cutoffs"] += 1
+                break
+    transpositions[key] = v
     return v
+
+
+# Score of a won position before subtracting the number of moves it takes, above any heuristic score
+WIN = 1000000
+
+
+class Timeout(Exception):
+    """
+    Raised inside a Search when its time budget runs out.
+    """
+
+
+class Search():
+    """
+    Alpha-beta search of an m,n,k Variant with iterative deepening, stopped after `budget`
+    seconds (None for no limit) or at `max_depth` moves ahead.
+
+    Moves are tried best first: the best move found for the position by the previous depth,
+    then the moves that caused the most cutoffs so far, then cells on the most win lines.
+    Positions beyond the depth limit are scored by the open lines of each player.
+    Root moves with equal scores are decided by Variant.rank, not by the order they were
+    searched in, so root_parallel finds the same move as best_move.
+    """
+
+    def __init__(self, variant=CLASSIC, budget=None, max_depth=None, table=None):
+        self.variant = variant
+        self.started = time.perf_counter()
+        self.deadline = None if budget is None else self.started + budget
+        self.max_depth = variant.cells if max_depth is None else max_depth
+        # (mover's mask, opponent's mask) -> (depth, score, bound, best move),
+        # can be shared by searches of the same variant
+        self.table = {} if table is None else table
+        self.history = [0] * variant.cells
+        # Heuristic value of a line holding i of one player's marks and none of the other's
+        self.weights = [0] + [4 ** i for i in range(1, variant.k + 1)]
+        self.nodes = 0
+        self.cutoffs = 0
+        self.hits = 0
+        # Deepest finished depth, its score and the best root move of the depth being searched
+        self.depth = 0
+        self.score = 0
+        self.root = None
+
+    def best_move(self, bits):
+        """
+        Returns the best cell (row * columns + column) found for the player to move
+        on a bitboard that is not terminal.
+        """
+        (x, o) = bits
+        mine, theirs = (x, o) if bit_player(bits) == X else (o, x)
+        empty = self.variant.full & ~(x | o)
+        best = self.ordered(empty, None)[0]
+        for depth in range(1, min(self.max_depth, bin(empty).count("1")) + 1):
+            self.root = None
+            try:
+                self.score = self.negamax(mine, theirs, depth, -WIN - 1, WIN + 1, 0)
+            except Timeout:
+                # The unfinished depth searched the previous best move first, so anything
+                # it found better than that is still an improvement
+                if self.root is not None:
+                    best = self.root
+                break
+            best = self.root
+            self.depth = depth
+            # Won or lost for certain, searching deeper can not change the move
+            if abs(self.score) > WIN - self.variant.cells - 1:
+                break
+        return best
+
+    def stats(self):
+        """
+        Returns the work done so far: nodes searched, beta cutoffs, transposition table hits,
+        the deepest finished depth, its score for the player to move and the seconds since the start.
+        """
+        return {
+            "nodes": self.nodes,
+            "cutoffs": self.cutoffs,
+            "hits": self.hits,
+            "depth": self.depth,
+            "score": self.score,
+            "seconds": time.perf_counter() - self.started,
+        }
+
+    def ordered(self, empty, first):
+        """
+        Returns the empty cells in the order they are searched, `first` first.
+        """
+        moves = [cell for cell in self.variant.order if empty >> cell & 1]
+        moves.sort(key=lambda cell: -self.history[cell])
+        if first is not None:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def evaluate(self, mine, theirs):
+        """
+        Returns the heuristic score of a position for the player to move.
+        """
+        score = 0
+        for line in self.variant.wins:
+            if not line & theirs:
+                score += self.weights[bin(line & mine).count("1")]
+            elif not line & mine:
+                score -= self.weights[bin(line & theirs).count("1")]
+        return score
+
+    def negamax(self, mine, theirs, depth, alpha, beta, ply):
+        """
+        Returns the score of a position for the player to move, whose marks are `mine`,
+        searched `depth` moves ahead within the (alpha, beta) window.
+        """
+        self.nodes += 1
+        if self.deadline is not None and self.nodes & 255 == 0 and time.perf_counter() > self.deadline:
+            raise Timeout()
+        variant = self.variant
+        empty = variant.full & ~(mine | theirs)
+        if not empty:
+            return 0
+        if depth == 0:
+            return self.evaluate(mine, theirs)
+
+        key = (mine, theirs)
+        first = None
+        entry = self.table.get(key)
+        if entry is not None:
+            self.hits += 1
+            (stored, score, bound, first) = entry
+            # Won scores are stored relative to this position, not to the root
+            if abs(score) > WIN - variant.cells - 1:
+                score -= ply if score > 0 else -ply
+            if stored >= depth and ply:
+                if bound == 0:
+                    return score
+                if bound > 0:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        start = alpha
+        best = -WIN - 1
+        best_move = None
+        for move in self.ordered(empty, first):
+            placed = mine | 1 << move
+            if any(placed & line == line for line in variant.lines[move]):
+                # Sooner wins score higher
+                score = WIN - ply - 1
+            elif ply == 0:
+                # Root moves equal to the best so far are searched exactly, one below alpha
+                score = -self.negamax(theirs, placed, depth - 1, -beta, -(alpha - 1), 1)
+            else:
+                score = -self.negamax(theirs, placed, depth - 1, -beta, -alpha, ply + 1)
+            if score > best or (ply == 0 and score == best and variant.rank[move] < variant.rank[best_move]):
+                best = score
+                best_move = move
+                if ply == 0:
+                    self.root = move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self.cutoffs += 1
+                self.history[move] += depth * depth
+                break
+
+        bound = 1 if best >= beta else -1 if best <= start else 0
+        stored = best
+        if abs(best) > WIN - variant.cells - 1:
+            stored += ply if best > 0 else -ply
+        self.table[key] = (depth, stored, bound, best_move)
+        return best
+
+
+def alphabeta(board, variant=CLASSIC, budget=1.0, max_depth=None, processes=1):
+    """
+    Returns the best action (i, j) found for the current player on a board of `variant`
+    within `budget` seconds (None for no limit), or None if the game is over.
+    With `processes` > 1 the root moves are searched in parallel by root_parallel.
+    """
+    bits = to_bitboard(board)
+    if bit_terminal(bits, variant):
+        return None
+    search = Search(variant, budget, max_depth)
+    if processes > 1:
+        return divmod(root_parallel(search, bits, processes), variant.columns)
+    return divmod(search.best_move(bits), variant.columns)
+
+
+def root_parallel(search, bits, processes):
+    """
+    Does search.best_move(bits) with the subtree of every root move searched by a pool of
+    `processes` worker processes, and returns the same move and score (search.score).
+
+    Every depth the most promising root move is searched first in this process, to start the
+    shared bound at a good score, then the others are handed out best first. Workers share the
+    best root score found so far and
+    search each move one below it, so they prune moves that cannot be best and still score every
+    move that ties the best exactly. Ties go to Variant.rank like in best_move, so without a
+    budget the result does not depend on which worker finishes first. With a budget the depth
+    reached depends on the machine, like in best_move.
+    """
+    variant = search.variant
+    (x, o) = bits
+    mine, theirs = (x, o) if bit_player(bits) == X else (o, x)
+    empty = variant.full & ~(x | o)
+    moves = search.ordered(empty, None)
+    # A move that wins at once is the best move at every depth
+    winning = [move for move in moves
+               if any((mine | 1 << move) & line == line for line in variant.lines[move])]
+    if winning:
+        search.depth, search.score = 1, WIN - 1
+        return min(winning, key=lambda move: variant.rank[move])
+
+    best = moves[0]
+    bound = pool_context().Value("q", 0)
+    with pool_context().Pool(processes, initializer=init_root_worker,
+                             initargs=(variant, search.deadline, bound)) as pool:
+        for depth in range(1, min(search.max_depth, bin(empty).count("1")) + 1):
+            try:
+                first = -search.negamax(theirs, mine | 1 << moves[0], depth - 1, -WIN - 1, WIN + 1, 1)
+            except Timeout:
+                break
+            bound.value = first
+            scores = {moves[0]: first}
+            tasks = [(mine, theirs, move, depth) for move in moves[1:]]
+            for move, score, nodes in pool.imap(search_root_move, tasks, chunksize=1):
+                search.nodes += nodes
+                if score is not None:
+                    scores[move] = score
+            if len(scores) < len(moves):
+                # Out of time, the finished depths decide
+                break
+            top = max(scores.values())
+            best = min((move for move in moves if scores[move] == top), key=lambda move: variant.rank[move])
+            search.depth, search.score = depth, top
+            if abs(top) > WIN - variant.cells - 1:
+                break
+            # Searching the best moves first next depth raises the shared bound sooner
+            moves.sort(key=lambda move: -scores[move])
+    return best
+
+
+def init_root_worker(variant, deadline, bound):
+    """
+    Sets up a root_parallel worker process with its own Search and the shared bound.
+    """
+    global root_search, root_bound
+    root_search = Search(variant)
+    root_search.deadline = deadline
+    root_bound = bound
+
+
+def search_root_move(task):
+    """
+    Scores one (mine, theirs, move, depth) root move of root_parallel and raises the shared bound.
+    Returns (move, score, nodes searched), the score None if time ran out, or at most the bound
+    minus one when the move can not be the best.
+    """
+    (mine, theirs, move, depth) = task
+    nodes = root_search.nodes
+    alpha = root_bound.value
+    try:
+        score = -root_search.negamax(theirs, mine | 1 << move, depth - 1, -WIN - 1, -(alpha - 1), 1)
+    except Timeout:
+        return move, None, root_search.nodes - nodes
+    with root_bound.get_lock():
+        if score > root_bound.value:
+            root_bound.value = score
+    return move, score, root_search.nodes - nodes
+
+
+def instrumented(board, variant=CLASSIC, budget=None, max_depth=None, cache=None):
+    """
+    Returns (action, stats) for the current player on a board, action being None if the game is over.
+
+    The classic game without a budget or depth limit is answered exactly like minimax, from the
+    perfect play table or by search, anything else by a Search using `cache` as its transposition
+    table. stats has the "source" of the answer ("table", "minimax" or "alphabeta"), the "nodes"
+    searched, "cutoffs", transposition table "hits", "seconds", and the "value" of the board for X
+    (1, 0 or -1) when it is known for certain. Searches also report their "depth" and "score".
+    """
+    started = time.perf_counter()
+    bits = to_bitboard(board)
+    stats = {"source": None, "nodes": 0, "cutoffs": 0, "hits": 0, "value": None}
+    if bit_terminal(bits, variant):
+        stats["value"] = bit_utility(bits, variant)
+        action = None
+    elif variant == CLASSIC and budget is None and max_depth is None:
+        before = dict(counters)
+        if load_table() and canonical(bits) in table:
+            stats["source"] = "table"
+            action = minimax(board)
+            stats["value"] = (table[canonical(bits)] >> 4) - 1
+        else:
+            stats["source"] = "minimax"
+            action = minimax(board)
+            stats["value"] = bit_value(bits)
+        for name in counters:
+            stats[name] = counters[name] - before[name]
+    else:
+        search = Search(variant, budget, max_depth, cache)
+        action = divmod(search.best_move(bits), variant.columns)
+        stats.update(search.stats(), source="alphabeta")
+        # Proven wins and losses are scores for the player to move, and a search to the end
+        # of the game is exact
+        empty = variant.cells - bin(bits[0] | bits[1]).count("1")
+        if abs(search.score) > WIN - variant.cells - 1 or search.depth >= empty:
+            won = (search.score > 0) - (search.score < 0)
+            stats["value"] = won if bit_player(bits) == X else -won
+    stats["seconds"] = time.perf_counter() - started
+    return action, stats
+
+
+def evaluate_boards(boards, variant=CLASSIC, budget=None, max_depth=None, processes=1):
+    """
+    Returns instrumented(board, ...) for every board of `boards`, in order.
+
+    Boards evaluated in the same process share one cache: the transposition table of the exact
+    search, or one Search table for the other variants and limits. With `processes` > 1 the boards
+    are split into one contiguous chunk per process, so positions of the same game tend to share a cache.
+    """
+    boards = list(boards)
+    if processes <= 1 or len(boards) < 2:
+        return evaluate_chunk((boards, variant, budget, max_depth))
+    size = -(-len(boards) // processes)
+    chunks = [(boards[i:i + size], variant, budget, max_depth) for i in range(0, len(boards), size)]
+    with pool_context().Pool(min(processes, len(chunks))) as pool:
+        return [answer for answers in pool.map(evaluate_chunk, chunks) for answer in answers]
+
+
+def evaluate_chunk(task):
+    """
+    Evaluates one (boards, variant, budget, max_depth) chunk of evaluate_boards with one shared cache.
+    """
+    (boards, variant, budget, max_depth) = task
+    # The exact search always shares the module's transposition table
+    cache = {}
+    return [instrumented(board, variant, budget, max_depth, cache) for board in boards]
+
+
+def pool_context():
+    """
+    Returns the multiprocessing context for worker pools.
+    Preferring fork so the workers start with the already loaded tables.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="tictactoe.py")
+    parser.add_argument("--build-table", metavar="FILE", nargs="?", const=TABLE,
+                        help=f"solve the game and write the perfect play table minimax loads (default {TABLE})")
+    parser.add_argument("--evaluate", metavar="FILE",
+                        help="evaluate the boards of FILE (\"-\" for stdin), one JSON list of rows per line, "
+                             "and write the action and search statistics of each as JSON lines")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes for --evaluate")
+    parser.add_argument("--size", type=int, nargs=3, metavar=("ROWS", "COLUMNS", "K"), default=(3, 3, 3),
+                        help="board size and win length for --evaluate")
+    parser.add_argument("--budget", type=float,
+                        help="seconds per board for --evaluate, searching with alpha-beta")
+    parser.add_argument("--depth", type=int,
+                        help="moves ahead per board for --evaluate, searching with alpha-beta")
+    args = parser.parse_args()
+    if args.build_table:
+        print(f"Wrote {build_table(args.build_table)} positions to {args.build_table}.")
+    elif args.evaluate:
+        with (sys.stdin if args.evaluate == "-" else open(args.evaluate)) as f:
+            boards = [json.loads(line) for line in f if line.strip()]
+        for action, stats in evaluate_boards(boards, Variant(*args.size), args.budget, args.depth, args.processes):
+            print(json.dumps({"action": action, **stats}))
+    else:
+        parser.print_help()